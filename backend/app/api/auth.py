@@ -6,9 +6,9 @@ from ..database import get_db
 from ..models.schemas import UserCreate, User, Token
 from ..services.auth import (
     authenticate_user, create_user, create_access_token,
-    get_current_user, get_user_by_email
+    email_registered, get_current_user
 )
-from ..config.settings import settings
+from ..config.settings import Settings, get_settings
 
 router = APIRouter(tags=["authentication"])
 
@@ -16,8 +16,9 @@ router = APIRouter(tags=["authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 
-# Dependency for protected routes
-async def get_current_user_dependency(
+# Dependency for protected routes. Kept sync so FastAPI runs the blocking
+# user lookup in its threadpool instead of on the event loop.
+def get_current_user_dependency(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
@@ -36,8 +37,7 @@ async def get_current_user_dependency(
 def register(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     # Check if user already exists
-    db_user = get_user_by_email(db, email=user.email)
-    if db_user:
+    if email_registered(db, user.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -48,7 +48,11 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+    settings: Settings = Depends(get_settings)
+):
     """Login user and return access token"""
     user = authenticate_user(db, form_data.username, form_data.password)
     if not user:
@@ -0,0 +1,47 @@
+"""
+Conditional GET helpers
+Lets polling clients revalidate list endpoints with ETag / If-None-Match
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+
+def collection_etag(db: Session, model, *criteria, extra: tuple = ()) -> str:
+    """Weak ETag for the rows matching criteria, derived from their count and latest update
+
+    The count changes on inserts and deletes, the max updated_at on edits, so
+    one aggregate over an indexed filter stands in for the full page.
+    """
+    count, last_updated = db.query(
+        func.count(model.id), func.max(model.updated_at)
+    ).filter(*criteria).one()
+    digest = hashlib.blake2b(repr((count, last_updated, *extra)).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 if the client already holds etag, otherwise tag the outgoing response"""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def body_etag(body: bytes) -> str:
+    """Weak ETag for an already serialized response body"""
+    return f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def json_body_response(request: Request, response: Response, etag: str, body: bytes) -> Response:
+    """Send a pre-serialized JSON body, or a 304 if the client already holds it"""
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
@@ -1,32 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session, contains_eager
+from typing import List, Set
+from ..database import construct_from_row, get_db, strict_query, response_columns, upsert_insert
 from ..models.listing import Listing as ListingModel
 from ..models.requirement import Requirement as RequirementModel
 from ..models.schemas import ListingOut, ListingCreate, ListingUpdate, ListingsResponse
 from ..api.auth import get_current_user_dependency
+from .requirements import delete_listings, get_user_requirement_ids
+from .http_cache import collection_etag, not_modified
 from ..models.user import User
 
 router = APIRouter(prefix="/listings", tags=["listings"])
 
+# Most listings one bulk request may carry; longer batches get a 422 rather
+# than one unbounded INSERT and response
+MAX_BULK_LISTINGS = 500
+
+def get_owned_listing(db: Session, listing_id: str, user_id: str) -> ListingModel:
+    """Fetch a listing and verify its requirement belongs to the user in one query"""
+    # The joined requirement row also populates listing.requirement, so
+    # callers can read it without triggering a lazy load
+    return strict_query(db, ListingModel).join(ListingModel.requirement).options(
+        contains_eager(ListingModel.requirement)
+    ).filter(
+        ListingModel.id == listing_id,
+        RequirementModel.user_id == user_id
+    ).first()
+
 @router.get("/{requirement_id}", response_model=ListingsResponse)
 def get_listings_for_requirement(
     requirement_id: str,
-    current_user: User = Depends(get_current_user_dependency),
+    request: Request,
+    response: Response,
+    owned_requirement_ids: Set[str] = Depends(get_user_requirement_ids),
     db: Session = Depends(get_db)
 ):
     """Fetch all listings for a given requirement"""
     # Ensure requirement belongs to user
-    requirement = db.query(RequirementModel).filter(
-        RequirementModel.id == requirement_id,
-        RequirementModel.user_id == current_user.id
-    ).first()
-    if not requirement:
+    if requirement_id not in owned_requirement_ids:
         raise HTTPException(status_code=404, detail="Requirement not found")
-    listings = db.query(ListingModel).filter(ListingModel.requirement_id == requirement_id).all()
-    total = db.query(ListingModel).filter(ListingModel.requirement_id == requirement_id).count()
-    return ListingsResponse(listings=listings, total=total)
+    etag = collection_etag(db, ListingModel, ListingModel.requirement_id == requirement_id)
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
+    listings = strict_query(db, ListingModel).options(
+        response_columns(ListingModel, ListingOut)
+    ).filter(ListingModel.requirement_id == requirement_id).all()
+    # Serialize straight from the rows, skipping per-row validation here and
+    # FastAPI's response_model pass
+    body = ListingsResponse.model_construct(
+        listings=[construct_from_row(ListingOut, listing) for listing in listings],
+        total=len(listings)
+    ).model_dump_json().encode()
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
 
 @router.get("/item/{listing_id}", response_model=ListingOut)
 def get_listing(
@@ -34,41 +60,68 @@ def get_listing(
     current_user: User = Depends(get_current_user_dependency),
     db: Session = Depends(get_db)
 ):
-    listing = db.query(ListingModel).filter(ListingModel.id == listing_id).first()
+    listing = get_owned_listing(db, listing_id, current_user.id)
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    # Check user owns the requirement
-    requirement = db.query(RequirementModel).filter(
-        RequirementModel.id == listing.requirement_id,
-        RequirementModel.user_id == current_user.id
-    ).first()
-    if not requirement:
-        raise HTTPException(status_code=403, detail="Not authorized")
     return listing
 
 @router.post("/", response_model=ListingOut)
 def create_listing(
     listing: ListingCreate,
-    current_user: User = Depends(get_current_user_dependency),
+    owned_requirement_ids: Set[str] = Depends(get_user_requirement_ids),
     db: Session = Depends(get_db)
 ):
     # Convert UUID to string for SQLite compatibility
     requirement_id_str = str(listing.requirement_id)
     # Check user owns the requirement
-    requirement = db.query(RequirementModel).filter(
-        RequirementModel.id == requirement_id_str,
-        RequirementModel.user_id == current_user.id
-    ).first()
-    if not requirement:
+    if requirement_id_str not in owned_requirement_ids:
         raise HTTPException(status_code=403, detail="Not authorized to add listing to this requirement")
     # Create listing with string requirement_id
     listing_dict = listing.model_dump()
     listing_dict["requirement_id"] = requirement_id_str
-    db_listing = ListingModel(**listing_dict)
-    db.add(db_listing)
+    # INSERT ... RETURNING hands back the stored row in the same round-trip;
+    # serialize it before commit expires the instance and forces a reload.
+    # A listing the requirement already has returns no row.
+    db_listing = db.scalars(
+        upsert_insert(db)(ListingModel).values(**listing_dict).on_conflict_do_nothing(
+            index_elements=["requirement_id", "external_id"]
+        ).returning(ListingModel)
+    ).one_or_none()
+    if db_listing is None:
+        raise HTTPException(status_code=409, detail="Listing already exists for this requirement")
+    listing_out = ListingOut.model_validate(db_listing)
     db.commit()
-    db.refresh(db_listing)
-    return db_listing
+    return listing_out
+
+@router.post("/bulk", response_model=ListingsResponse)
+def create_listings_bulk(
+    listings: List[ListingCreate] = Body(..., max_length=MAX_BULK_LISTINGS),
+    owned_requirement_ids: Set[str] = Depends(get_user_requirement_ids),
+    db: Session = Depends(get_db)
+):
+    """Create many listings in a single multi-row INSERT and one commit
+
+    Listings whose external_id the requirement already has are skipped, so
+    re-posting a batch is safe; only newly stored listings are returned.
+    """
+    rows = [listing.model_dump() for listing in listings]
+    for row in rows:
+        row["requirement_id"] = str(row["requirement_id"])
+    # One ownership check per distinct requirement rather than per row
+    for requirement_id in {row["requirement_id"] for row in rows}:
+        if requirement_id not in owned_requirement_ids:
+            raise HTTPException(status_code=403, detail="Not authorized to add listing to this requirement")
+    if not rows:
+        return ListingsResponse(listings=[], total=0)
+    db_listings = db.scalars(
+        upsert_insert(db)(ListingModel).on_conflict_do_nothing(
+            index_elements=["requirement_id", "external_id"]
+        ).returning(ListingModel),
+        rows
+    ).all()
+    response = ListingsResponse(listings=db_listings, total=len(db_listings))
+    db.commit()
+    return response
 
 @router.patch("/item/{listing_id}", response_model=ListingOut)
 def update_listing(
@@ -77,16 +130,9 @@ def update_listing(
     current_user: User = Depends(get_current_user_dependency),
     db: Session = Depends(get_db)
 ):
-    db_listing = db.query(ListingModel).filter(ListingModel.id == listing_id).first()
+    db_listing = get_owned_listing(db, listing_id, current_user.id)
     if not db_listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    # Check user owns the requirement
-    requirement = db.query(RequirementModel).filter(
-        RequirementModel.id == db_listing.requirement_id,
-        RequirementModel.user_id == current_user.id
-    ).first()
-    if not requirement:
-        raise HTTPException(status_code=403, detail="Not authorized")
     update_data = listing_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_listing, field, value)
@@ -94,22 +140,15 @@ def update_listing(
     db.refresh(db_listing)
     return db_listing
 
-@router.delete("/item/{listing_id}")
+@router.delete("/item/{listing_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_listing(
     listing_id: str,
     current_user: User = Depends(get_current_user_dependency),
     db: Session = Depends(get_db)
 ):
-    db_listing = db.query(ListingModel).filter(ListingModel.id == listing_id).first()
+    db_listing = get_owned_listing(db, listing_id, current_user.id)
     if not db_listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    # Check user owns the requirement
-    requirement = db.query(RequirementModel).filter(
-        RequirementModel.id == db_listing.requirement_id,
-        RequirementModel.user_id == current_user.id
-    ).first()
-    if not requirement:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    db.delete(db_listing)
+    delete_listings(db, ListingModel.id == listing_id)
     db.commit()
-    return {"message": "Listing deleted successfully"} 
\ No newline at end of file
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List
-from ..database import get_db
+from ..database import construct_from_row, get_db, strict_query, response_columns
 from ..models.database import Message as MessageModel
 from ..models.listing import Listing as ListingModel
 from ..models.requirement import Requirement as RequirementModel
 from ..models.user import User
 from ..models.schemas import MessageOut, MessageCreate, MessagesResponse
 from ..api.auth import get_current_user_dependency
+from .listings import get_owned_listing
 
 router = APIRouter(prefix="/message", tags=["messages"])
 
+
+def messages_response(messages: List[MessageModel], total: int) -> Response:
+    """Serialize stored messages straight to JSON, skipping per-row validation"""
+    body = MessagesResponse.model_construct(
+        messages=[construct_from_row(MessageOut, message) for message in messages],
+        total=total
+    ).model_dump_json().encode()
+    return Response(content=body, media_type="application/json")
+
+
 @router.post("/send", response_model=MessageOut)
 def send_message(
     message: MessageCreate,
@@ -19,21 +31,14 @@ def send_message(
 ):
     """Send a message to a seller for a specific listing"""
     # Verify the listing exists and user owns the requirement
-    listing = db.query(ListingModel).filter(ListingModel.id == message.listing_id).first()
+    listing = get_owned_listing(db, message.listing_id, current_user.id)
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
     
-    requirement = db.query(RequirementModel).filter(
-        RequirementModel.id == listing.requirement_id,
-        RequirementModel.user_id == current_user.id
-    ).first()
-    if not requirement:
-        raise HTTPException(status_code=403, detail="Not authorized to send message for this listing")
-    
     # Create the message
     db_message = MessageModel(
         listing_id=message.listing_id,
-        role=message.role,
+        message_type=message.message_type,
         content=message.content
     )
     db.add(db_message)
@@ -49,25 +54,16 @@ def get_message_history(
 ):
     """Get conversation history for a specific listing"""
     # Verify the listing exists and user owns the requirement
-    listing = db.query(ListingModel).filter(ListingModel.id == listing_id).first()
+    listing = get_owned_listing(db, listing_id, current_user.id)
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
     
-    requirement = db.query(RequirementModel).filter(
-        RequirementModel.id == listing.requirement_id,
-        RequirementModel.user_id == current_user.id
-    ).first()
-    if not requirement:
-        raise HTTPException(status_code=403, detail="Not authorized to view messages for this listing")
-    
-    # Get all messages for this listing, ordered by timestamp
-    messages = db.query(MessageModel).filter(
+    # Get all messages for this listing, ordered by creation time
+    messages = strict_query(db, MessageModel).filter(
         MessageModel.listing_id == listing_id
-    ).order_by(MessageModel.timestamp).all()
-    
-    total = db.query(MessageModel).filter(MessageModel.listing_id == listing_id).count()
+    ).order_by(MessageModel.created_at).all()
     
-    return MessagesResponse(messages=messages, total=total)
+    return messages_response(messages, len(messages))
 
 @router.get("/history", response_model=MessagesResponse)
 def get_all_messages(
@@ -77,27 +73,31 @@ def get_all_messages(
     limit: int = 100
 ):
     """Get all messages for all listings owned by the current user"""
-    # Get all requirements for the user
-    user_requirements = db.query(RequirementModel).filter(
+    # Walk user -> requirements -> listings -> messages in a single JOIN; the
+    # window count carries the unpaginated total on every row
+    rows = strict_query(db, MessageModel, func.count().over().label("total_count")).options(
+        response_columns(MessageModel, MessageOut)
+    ).join(
+        ListingModel, ListingModel.id == MessageModel.listing_id
+    ).join(
+        RequirementModel, RequirementModel.id == ListingModel.requirement_id
+    ).filter(
         RequirementModel.user_id == current_user.id
-    ).all()
-    
-    requirement_ids = [req.id for req in user_requirements]
-    
-    # Get all listings for these requirements
-    user_listings = db.query(ListingModel).filter(
-        ListingModel.requirement_id.in_(requirement_ids)
-    ).all()
-    
-    listing_ids = [listing.id for listing in user_listings]
-    
-    # Get all messages for these listings
-    messages = db.query(MessageModel).filter(
-        MessageModel.listing_id.in_(listing_ids)
-    ).order_by(MessageModel.timestamp.desc()).offset(skip).limit(limit).all()
+    ).order_by(MessageModel.created_at.desc()).offset(skip).limit(limit).all()
     
-    total = db.query(MessageModel).filter(
-        MessageModel.listing_id.in_(listing_ids)
-    ).count()
+    messages = [row[0] for row in rows]
+    if rows:
+        total = rows[0].total_count
+    elif skip:
+        # Paged past the end, so there is no row to carry the window count
+        total = strict_query(db, func.count(MessageModel.id)).join(
+            ListingModel, ListingModel.id == MessageModel.listing_id
+        ).join(
+            RequirementModel, RequirementModel.id == ListingModel.requirement_id
+        ).filter(
+            RequirementModel.user_id == current_user.id
+        ).scalar()
+    else:
+        total = 0
     
-    return MessagesResponse(messages=messages, total=total) 
\ No newline at end of file
+    return messages_response(messages, total)
@@ -6,12 +6,18 @@ Handles listing analysis and information extraction
 from fastapi import APIRouter, Depends, HTTPException, Body
 from typing import List, Dict, Optional, Any
 from pydantic import BaseModel
+from ..services.scraper import get_listing_details
 from ..services.parser import analyze_listing, analyze_multiple_listings, extract_key_information, compare_listings
 from ..api.auth import get_current_user_dependency
 from ..models.schemas import User as UserSchema
+from ..services.cache import TTLCache, normalize_url
 
 router = APIRouter(prefix="/parser", tags=["parser"])
 
+# Scraping and analyzing a URL is slow and costs an OpenAI call, so successful
+# results are shared across users for an hour
+url_analysis_cache = TTLCache(maxsize=10_000, ttl=3600)
+
 
 class ListingData(BaseModel):
     """Listing data for analysis"""
@@ -46,7 +52,7 @@ async def analyze_single_listing(
         Analyzed listing with insights
     """
     try:
-        listing_dict = listing.dict()
+        listing_dict = listing.model_dump()
         analyzed = await analyze_listing(listing_dict)
         
         return {
@@ -74,7 +80,7 @@ async def analyze_multiple_listings_endpoint(
         List of analyzed listings
     """
     try:
-        listings = [listing.dict() for listing in request.listings]
+        listings = [listing.model_dump() for listing in request.listings]
         analyzed_listings = await analyze_multiple_listings(listings)
         
         return {
@@ -103,7 +109,7 @@ async def extract_key_information_endpoint(
         Extracted key information
     """
     try:
-        listing_dict = listing.dict()
+        listing_dict = listing.model_dump()
         key_info = await extract_key_information(listing_dict)
         
         return {
@@ -131,7 +137,7 @@ async def compare_listings_endpoint(
         Comparison analysis
     """
     try:
-        listings = [listing.dict() for listing in request.listings]
+        listings = [listing.model_dump() for listing in request.listings]
         comparison = await compare_listings(listings)
         
         return {
@@ -158,9 +164,12 @@ async def analyze_listing_by_url(
     Returns:
         Analyzed listing data
     """
+    cache_key = normalize_url(url)
+    cached = url_analysis_cache.get(cache_key)
+    if cached is not None:
+        return {**cached, "url": url}
+    
     try:
-        from ..services.scraper import get_listing_details
-        
         # First get listing details
         listing_data = await get_listing_details(url)
         
@@ -170,12 +179,19 @@ async def analyze_listing_by_url(
         # Then analyze the listing
         analyzed = await analyze_listing(listing_data)
         
-        return {
+        result = {
             "status": "success",
             "url": url,
             "analysis": analyzed
         }
         
+        # Don't pin failed analyses in the cache
+        analysis = analyzed.get("analysis")
+        if isinstance(analysis, dict) and "error" not in analysis:
+            url_analysis_cache.set(cache_key, result)
+        
+        return result
+        
     except HTTPException:
         raise
     except Exception as e:
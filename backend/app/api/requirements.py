@@ -2,22 +2,88 @@
 Requirements API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Set
 import uuid
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
-from ..database import get_db
+from ..database import construct_from_row, get_db, strict_get, strict_query, response_columns
 from ..models.requirement import Requirement
-from ..models.schemas import RequirementCreate, RequirementOut, RequirementUpdate
+from ..models.listing import Listing
+from ..models.database import Message, ParsedResponse
+from ..models.schemas import RequirementCreate, RequirementOut, RequirementUpdate, RequirementsResponse
 from .auth import get_current_user_dependency
+from .http_cache import body_etag, collection_etag, json_body_response, not_modified
+from ..services.cache import requirements_cache
+from ..services.scraper import run_bounded_scrape
 from ..enums import ScrapingStatus
 
 router = APIRouter()
 
 
+def get_user_requirement_ids(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_dependency)
+) -> Set[str]:
+    """Dependency returning the IDs of the current user's requirements
+
+    FastAPI caches dependencies per request, so every ownership check made
+    while handling a request shares this one id-only query.
+    """
+    rows = strict_query(db, Requirement.id).filter(
+        Requirement.user_id == current_user.id
+    ).all()
+    return {row.id for row in rows}
+
+
+def get_owned_requirement(db: Session, requirement_id: str, user_id: str) -> Requirement:
+    """Fetch a requirement only if it belongs to the user
+
+    A primary-key get is served from the session identity map when the row is
+    already loaded. Someone else's requirement comes back as None, exactly
+    like a missing one, so ids can't be probed.
+    """
+    requirement = strict_get(db, Requirement, requirement_id)
+    if requirement is None or requirement.user_id != user_id:
+        return None
+    return requirement
+
+
+def delete_listings(db: Session, *criteria) -> None:
+    """Delete the listings matching criteria along with their messages and parsed responses
+
+    Session.delete() would load every dependent relationship and then issue
+    one statement per child row; these set-based deletes, children first,
+    cost four statements however many listings match.
+    """
+    listing_ids = select(Listing.id).where(*criteria)
+    for statement in (
+        delete(Message).where(Message.listing_id.in_(listing_ids)),
+        delete(ParsedResponse).where(ParsedResponse.listing_id.in_(listing_ids)),
+        delete(Listing).where(*criteria),
+    ):
+        db.execute(statement, execution_options={"synchronize_session": False})
+
+
+def requirement_out(requirement: Requirement) -> RequirementOut:
+    """Build RequirementOut from a stored row without re-validating it"""
+    return construct_from_row(RequirementOut, requirement)
+
+
+def write_through(user_id: str, requirement_id: str, body: bytes) -> str:
+    """After a write, drop the user's cached lists and cache the new body for reads
+
+    Returns the body's ETag, matching what get_requirement will serve.
+    """
+    etag = body_etag(body)
+    requirements_cache.reset(user_id, f"item:{requirement_id}", etag, body)
+    return etag
+
+
 @router.post("/", response_model=RequirementOut)
 def create_requirement(
     requirement: RequirementCreate,
@@ -26,14 +92,18 @@ def create_requirement(
 ):
     """Create a new requirement"""
     try:
-        db_requirement = Requirement(
-            user_id=current_user.id,
-            **requirement.dict()
-        )
-        db.add(db_requirement)
+        # INSERT ... RETURNING hands back the stored row in the same round-trip;
+        # serialize it before commit expires the instance and forces a reload
+        db_requirement = db.scalars(
+            insert(Requirement).values(
+                user_id=current_user.id,
+                **requirement.model_dump()
+            ).returning(Requirement)
+        ).one()
+        body = RequirementOut.model_validate(db_requirement).model_dump_json().encode()
         db.commit()
-        db.refresh(db_requirement)
-        return db_requirement
+        etag = write_through(current_user.id, db_requirement.id, body)
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
     except SQLAlchemyError as e:
         db.rollback()
         logging.error(f"DB error creating requirement: {e}")
@@ -43,31 +113,71 @@ def create_requirement(
         raise HTTPException(status_code=422, detail=f"Validation error: {e}")
 
 
-@router.get("/", response_model=List[RequirementOut])
+@router.get("/", response_model=RequirementsResponse)
 def get_requirements(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user_dependency)
 ):
     """Get all requirements for the current user"""
-    requirements = db.query(Requirement).filter(
+    cache_entry = f"list:{skip}:{limit}"
+    cached = requirements_cache.get(current_user.id, cache_entry)
+    if cached:
+        return json_body_response(request, response, *cached)
+    
+    etag = collection_etag(
+        db, Requirement, Requirement.user_id == current_user.id,
+        extra=(current_user.id, skip, limit)
+    )
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
+    
+    # The window count carries the unpaginated total on every row
+    rows = strict_query(db, Requirement, func.count().over().label("total_count")).options(
+        response_columns(Requirement, RequirementOut)
+    ).filter(
         Requirement.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return requirements
+    ).order_by(Requirement.created_at.desc()).offset(skip).limit(limit).all()
+    
+    if rows:
+        total = rows[0].total_count
+    elif skip:
+        # Paged past the end, so there is no row to carry the window count
+        total = strict_query(db, func.count(Requirement.id)).filter(
+            Requirement.user_id == current_user.id
+        ).scalar()
+    else:
+        total = 0
+    
+    # Serialize once, straight from the ORM rows, and keep the bytes so cache
+    # hits skip both the queries and serialization
+    body = RequirementsResponse.model_construct(
+        requirements=[requirement_out(row[0]) for row in rows],
+        total=total
+    ).model_dump_json().encode()
+    requirements_cache.set(current_user.id, cache_entry, etag, body)
+    return json_body_response(request, response, etag, body)
 
 
 @router.get("/{requirement_id}", response_model=RequirementOut)
 def get_requirement(
     requirement_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user_dependency)
 ):
     """Get a specific requirement by ID"""
-    requirement = db.query(Requirement).filter(
-        Requirement.id == requirement_id,
-        Requirement.user_id == current_user.id
-    ).first()
+    cache_entry = f"item:{requirement_id}"
+    cached = requirements_cache.get(current_user.id, cache_entry)
+    if cached:
+        return json_body_response(request, response, *cached)
+    
+    requirement = get_owned_requirement(db, requirement_id, current_user.id)
     
     if not requirement:
         raise HTTPException(
@@ -75,10 +185,13 @@ def get_requirement(
             detail="Requirement not found"
         )
     
-    return requirement
+    body = requirement_out(requirement).model_dump_json().encode()
+    etag = body_etag(body)
+    requirements_cache.set(current_user.id, cache_entry, etag, body)
+    return json_body_response(request, response, etag, body)
 
 
-@router.put("/{requirement_id}", response_model=RequirementOut)
+@router.api_route("/{requirement_id}", methods=["PUT", "PATCH"], response_model=RequirementOut)
 def update_requirement(
     requirement_id: str,
     requirement_update: RequirementUpdate,
@@ -86,10 +199,19 @@ def update_requirement(
     current_user = Depends(get_current_user_dependency)
 ):
     """Update a requirement"""
-    db_requirement = db.query(Requirement).filter(
-        Requirement.id == requirement_id,
-        Requirement.user_id == current_user.id
-    ).first()
+    update_data = requirement_update.model_dump(exclude_unset=True)
+    
+    if update_data:
+        # UPDATE ... RETURNING applies the change, checks ownership and hands
+        # back the stored row, new updated_at included, in one round-trip
+        db_requirement = db.scalars(
+            update(Requirement).where(
+                Requirement.id == requirement_id,
+                Requirement.user_id == current_user.id
+            ).values(**update_data).returning(Requirement)
+        ).one_or_none()
+    else:
+        db_requirement = get_owned_requirement(db, requirement_id, current_user.id)
     
     if not db_requirement:
         raise HTTPException(
@@ -97,26 +219,21 @@ def update_requirement(
             detail="Requirement not found"
         )
     
-    update_data = requirement_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_requirement, field, value)
-    
+    # Serialize before commit expires the instance and forces a reload
+    body = requirement_out(db_requirement).model_dump_json().encode()
     db.commit()
-    db.refresh(db_requirement)
-    return db_requirement
+    etag = write_through(current_user.id, requirement_id, body)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
-@router.delete("/{requirement_id}")
+@router.delete("/{requirement_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_requirement(
     requirement_id: str,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user_dependency)
 ):
     """Delete a requirement"""
-    db_requirement = db.query(Requirement).filter(
-        Requirement.id == requirement_id,
-        Requirement.user_id == current_user.id
-    ).first()
+    db_requirement = get_owned_requirement(db, requirement_id, current_user.id)
     
     if not db_requirement:
         raise HTTPException(
@@ -124,9 +241,28 @@ def delete_requirement(
             detail="Requirement not found"
         )
     
-    db.delete(db_requirement)
+    delete_listings(db, Listing.requirement_id == requirement_id)
+    db.execute(delete(Requirement).where(Requirement.id == requirement_id))
     db.commit()
-    return {"message": "Requirement deleted successfully"}
+    requirements_cache.invalidate(current_user.id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/{requirement_id}/trigger-scraping", status_code=status.HTTP_202_ACCEPTED)
+def trigger_scraping(
+    requirement_id: str,
+    background_tasks: BackgroundTasks,
+    owned_requirement_ids: Set[str] = Depends(get_user_requirement_ids)
+):
+    """Queue a scrape for a requirement; it runs after the response is sent"""
+    if requirement_id not in owned_requirement_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Requirement not found"
+        )
+    
+    background_tasks.add_task(run_bounded_scrape, requirement_id)
+    return {"message": "Scraping queued", "requirement_id": requirement_id}
 
 
 @router.get("/{requirement_id}/listings")
@@ -137,10 +273,7 @@ def get_requirement_listings(
 ):
     """Get all listings for a specific requirement"""
     # First verify the requirement belongs to the user
-    requirement = db.query(Requirement).filter(
-        Requirement.id == requirement_id,
-        Requirement.user_id == current_user.id
-    ).first()
+    requirement = get_owned_requirement(db, requirement_id, current_user.id)
     
     if not requirement:
         raise HTTPException(
@@ -148,14 +281,16 @@ def get_requirement_listings(
             detail="Requirement not found"
         )
     
-    # Get listings for this requirement
-    from ..models.listing import Listing
-    listings = db.query(Listing).filter(
-        Listing.requirement_id == requirement_id
+    # Plain column rows rather than ORM instances: nothing here is modified,
+    # so identity-map bookkeeping and jsonable_encoder's walk over each
+    # object are skipped, and orjson serializes the row dicts directly
+    rows = db.execute(
+        select(*Listing.__table__.columns).where(Listing.requirement_id == requirement_id)
     ).all()
+    listings = [row._asdict() for row in rows]
     
-    return {
+    return ORJSONResponse({
         "requirement_id": requirement_id,
         "listings": listings,
         "total": len(listings)
-    } 
\ No newline at end of file
+    })
\ No newline at end of file
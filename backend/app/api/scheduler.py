@@ -8,7 +8,7 @@ from typing import List, Dict, Optional, Any
 from pydantic import BaseModel
 from ..services.scheduler import (
     schedule_search_task, schedule_analysis_task, schedule_valuation_task,
-    get_task_status, cancel_task
+    get_task_status, cancel_task, list_tasks_for_user, get_queue_stats
 )
 from ..api.auth import get_current_user_dependency
 from ..models.schemas import User as UserSchema
@@ -137,13 +137,15 @@ async def get_task_status_endpoint(
         Task status information
     """
     try:
-        status = await get_task_status(task_id)
+        status = await get_task_status(task_id, str(current_user.id))
         
         return {
             "status": "success",
             "task_status": status
         }
         
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Task not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting task status: {str(e)}")
 
@@ -164,7 +166,7 @@ async def cancel_task_endpoint(
         Cancellation status
     """
     try:
-        cancelled = await cancel_task(task_id)
+        cancelled = await cancel_task(task_id, str(current_user.id))
         
         if cancelled:
             return {
@@ -199,33 +201,12 @@ async def list_user_tasks(
         List of user tasks
     """
     try:
-        # This would typically query the database for user tasks
-        # For now, we'll return a mock response
-        tasks = [
-            {
-                "task_id": "task_123",
-                "type": "search",
-                "status": "completed",
-                "created_at": "2024-01-15T10:30:00Z",
-                "completed_at": "2024-01-15T10:35:00Z",
-                "result": {
-                    "listings_found": 25,
-                    "requirement_id": "req_456"
-                }
-            },
-            {
-                "task_id": "task_124",
-                "type": "analysis",
-                "status": "queued",
-                "created_at": "2024-01-15T11:00:00Z",
-                "listings_count": 10
-            }
-        ]
+        tasks, total = await list_tasks_for_user(str(current_user.id), limit, offset)
         
         return {
             "status": "success",
-            "tasks": tasks[:limit],
-            "total": len(tasks),
+            "tasks": tasks,
+            "total": total,
             "limit": limit,
             "offset": offset
         }
@@ -248,17 +229,7 @@ async def get_queue_status(
         Queue status information
     """
     try:
-        # This would typically query Redis for queue status
-        # For now, we'll return a mock response
-        queue_status = {
-            "total_jobs": 5,
-            "queued_jobs": 2,
-            "running_jobs": 1,
-            "completed_jobs": 2,
-            "failed_jobs": 0,
-            "workers": 1,
-            "queue_name": "buysmart_tasks"
-        }
+        queue_status = await get_queue_stats()
         
         return {
             "status": "success",
@@ -3,6 +3,8 @@ Scraper API endpoints
 Handles web scraping operations
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Dict, Optional, Any
 from ..services.scraper import search_listings, get_listing_details
@@ -100,23 +102,29 @@ async def batch_search_listings(
     try:
         all_results = {}
         total_listings = 0
+        batch = queries[:5]  # Limit to 5 queries
+        
+        # Scraping is network-bound, so run the whole batch concurrently
+        results = await asyncio.gather(
+            *(search_listings(query, location, max_pages) for query in batch),
+            return_exceptions=True
+        )
         
-        for query in queries[:5]:  # Limit to 5 queries
-            try:
-                listings = await search_listings(query, location, max_pages)
+        for query, listings in zip(batch, results):
+            if isinstance(listings, Exception):
+                all_results[query] = {
+                    "status": "error",
+                    "error": str(listings),
+                    "listings_found": 0,
+                    "listings": []
+                }
+            else:
                 all_results[query] = {
                     "status": "success",
                     "listings_found": len(listings),
                     "listings": listings
                 }
                 total_listings += len(listings)
-            except Exception as e:
-                all_results[query] = {
-                    "status": "error",
-                    "error": str(e),
-                    "listings_found": 0,
-                    "listings": []
-                }
         
         return {
             "status": "success",
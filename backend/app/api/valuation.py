@@ -6,9 +6,11 @@ Handles value estimation and market insights
 from fastapi import APIRouter, Depends, HTTPException, Body, Query
 from typing import List, Dict, Optional, Any
 from pydantic import BaseModel
+from ..services.scraper import get_listing_details
 from ..services.valuation import estimate_value, compare_values, get_market_insights, batch_valuate_listings
 from ..api.auth import get_current_user_dependency
 from ..models.schemas import User as UserSchema
+from ..services.cache import market_insights_cache
 
 router = APIRouter(prefix="/valuation", tags=["valuation"])
 
@@ -46,7 +48,7 @@ async def estimate_listing_value(
         Valuation analysis
     """
     try:
-        listing_dict = listing.dict()
+        listing_dict = listing.model_dump()
         valuation = await estimate_value(listing_dict)
         
         return {
@@ -74,7 +76,7 @@ async def estimate_multiple_values(
         List of listings with valuations
     """
     try:
-        listings = [listing.dict() for listing in request.listings]
+        listings = [listing.model_dump() for listing in request.listings]
         valuated_listings = await batch_valuate_listings(listings)
         
         return {
@@ -103,7 +105,7 @@ async def compare_listing_values(
         Value comparison analysis
     """
     try:
-        listings = [listing.dict() for listing in request.listings]
+        listings = [listing.model_dump() for listing in request.listings]
         comparison = await compare_values(listings)
         
         return {
@@ -133,7 +135,13 @@ async def get_market_insights_endpoint(
         Market insights and recommendations
     """
     try:
-        insights = await get_market_insights(product_type, location)
+        # Market summaries don't depend on the user and move slowly, so one
+        # OpenAI call per product and location serves everyone for an hour
+        insights = await market_insights_cache.aget(product_type, location)
+        if insights is None:
+            insights = await get_market_insights(product_type, location)
+            if "error" not in insights:
+                await market_insights_cache.aset(insights, product_type, location)
         
         return {
             "status": "success",
@@ -162,8 +170,6 @@ async def estimate_value_by_url(
         Valuation analysis
     """
     try:
-        from ..services.scraper import get_listing_details
-        
         # First get listing details
         listing_data = await get_listing_details(url)
         
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -5,9 +6,19 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./test.db"
+    # Run create_all when the app starts, for local development and tests
+    create_tables_on_startup: bool = False
+    # Compiled SQL statements kept per engine (SQLAlchemy defaults to 500)
+    db_query_cache_size: int = 1200
+    # Connections held per process; lower these when running several workers
+    # behind PgBouncer so the server-side total stays bounded
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
     
     # Redis
     redis_url: str = "redis://localhost:6379"
+    # Seconds a cached API response may be served before it is rebuilt
+    response_cache_ttl: int = 60
     
     # JWT
     secret_key: str = "your-secret-key-here"
@@ -20,6 +31,8 @@ class Settings(BaseSettings):
     
     # OpenAI
     openai_api_key: Optional[str] = None
+    openai_max_concurrency: int = 5
+    openai_max_retries: int = 5
     
     # OLX Scraping
     olx_base_url: str = "https://www.olx.in"
@@ -29,10 +42,25 @@ class Settings(BaseSettings):
     # App Settings
     debug: bool = True
     environment: str = "development"
+    # Root log level; startup and health chatter is INFO, so hidden by default
+    log_level: str = "WARNING"
+    # Threads available to sync endpoints and dependencies (anyio defaults to 40)
+    worker_threads: int = 100
     
     class Config:
         env_file = ".env"
         case_sensitive = False
 
 
-settings = Settings() 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """The process-wide Settings, parsed from the environment once
+
+    Use Depends(get_settings) in endpoints so tests can swap it through
+    app.dependency_overrides.
+    """
+    return Settings()
+
+
+# Engine, cache and pool setup read configuration at import time
+settings = get_settings()
@@ -2,12 +2,78 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import String, create_engine, event, inspect, make_url
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker, raiseload, load_only
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.functions import now
+from sqlalchemy.types import TypeDecorator
+import logging
 import os
+import secrets
+import time
+import uuid
+from fastapi.concurrency import run_in_threadpool
+from functools import lru_cache
+from typing import Optional
 
-Base = declarative_base()
+from .config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["Base", "GUID", "engine", "get_engine", "SessionLocal", "get_db", "create_tables", "warm_pool"]
+
+class Base(DeclarativeBase):
+    """Declarative base for all models"""
+
+
+class GUID(TypeDecorator):
+    """UUID primary/foreign key, held as a str in Python
+
+    Postgres stores it as a native 16-byte uuid, so keys and their indexes
+    compare as integers rather than collated text. Other databases keep the
+    36-character string, matching rows written before this type existed.
+    """
+
+    impl = String(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(PG_UUID(as_uuid=False))
+        return dialect.type_descriptor(String(36))
+
+    def bind_processor(self, dialect):
+        if dialect.name != "postgresql":
+            # Ids are already str, so other dialects bind them as they are
+            # rather than through a Python call per value
+            return self.load_dialect_impl(dialect).bind_processor(dialect)
+        return super().bind_processor(dialect)
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            # A malformed id from a URL can't match any row; binding None
+            # makes that a miss instead of a database error
+            return None
+
+
+def new_id() -> str:
+    """Default for GUID primary keys: a UUIDv7 (RFC 9562)
+
+    The leading 48 bits are the Unix time in milliseconds, so new rows land at
+    the right-hand edge of the primary key index instead of on a random page.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | secrets.randbits(80)
+    value = value & ~(0xF << 76) | (0x7 << 76)  # version 7
+    value = value & ~(0x3 << 62) | (0x2 << 62)  # RFC 4122 variant
+    return str(uuid.UUID(int=value))
 
 # Database URL configuration for Vercel
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
@@ -16,38 +82,165 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-# Create engine with appropriate configuration
-if "sqlite" in DATABASE_URL:
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(DATABASE_URL)
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite tuning
+
+    WAL lets readers proceed while a write is in progress, and NORMAL sync
+    only fsyncs at checkpoints, which WAL keeps crash-safe. The rest keeps
+    temp tables, a 64MB page cache and a 256MB memory map in memory.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
+
+_engine: Optional[Engine] = None
+
+
+def get_engine() -> Engine:
+    """The process-wide engine, created on first call
+
+    Every caller shares one connection pool, however many times this module
+    is imported (warm serverless invocations, test fixtures).
+    """
+    global _engine
+    if _engine is not None:
+        return _engine
+    
+    # Queries are built with bound parameters throughout, so each distinct
+    # statement shape is compiled to SQL once and then served from the
+    # engine's compiled cache.
+    if "sqlite" in DATABASE_URL:
+        # File databases keep SQLAlchemy's default QueuePool, so threads never
+        # share a connection mid-transaction. An in-memory database only exists
+        # on the connection that created it, so that case shares one.
+        in_memory = make_url(DATABASE_URL).database in (None, "", ":memory:")
+        _engine = create_engine(
+            DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool if in_memory else None,
+            query_cache_size=settings.db_query_cache_size
+        )
+        event.listen(_engine, "connect", _set_sqlite_pragmas)
+    else:
+        # Keep enough warm connections for the worker threadpool and drop ones the
+        # server or a proxy has silently closed before handing them to a request.
+        # LIFO checkout keeps reusing the most recently returned connections, so
+        # the ones left idle at quiet times are the ones allowed to go stale.
+        _engine = create_engine(
+            DATABASE_URL,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=30,
+            pool_pre_ping=True,
+            pool_use_lifo=True,
+            pool_recycle=1800,
+            query_cache_size=settings.db_query_cache_size
+        )
+    return _engine
+
+
+engine = get_engine()
+
+
+def warm_pool() -> int:
+    """Open the pool's steady-state connections up front
+
+    QueuePool connects lazily, so without this the first burst of requests
+    pays for each connect in turn. All connections are held at once so the
+    pool can't hand the same one back; closing returns them to it open.
+    Returns the number of connections opened.
+    """
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = [engine.connect() for _ in range(size)]
+    for connection in connections:
+        connection.close()
+    return len(connections)
+
+
+@compiles(now, "sqlite")
+def _sqlite_now(element, compiler, **kw):
+    """Millisecond timestamps on SQLite, whose CURRENT_TIMESTAMP stops at seconds
+
+    ETags are derived from MAX(updated_at), so two edits in the same second
+    must still produce different values.
+    """
+    return "STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')"
+
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-def get_db():
-    """Dependency to get database session"""
+async def get_db():
+    """Dependency to get database session
+
+    Creating a Session does no I/O (it connects on first use), so it happens
+    on the event loop; only close(), which rolls back and returns the
+    connection to the pool, is sent to a worker thread. A sync generator
+    dependency would cost a thread hop on both sides.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        await run_in_threadpool(db.close)
+
+
+def strict_query(db: Session, *entities):
+    """Build a query that refuses lazy relationship loads in debug mode
+
+    Relationships a handler needs must be eager-loaded explicitly, so new code
+    cannot silently fall into an N+1 pattern.
+    """
+    query = db.query(*entities)
+    if settings.debug:
+        query = query.options(raiseload("*"))
+    return query
+
+
+def strict_get(db: Session, model, ident):
+    """Session.get by primary key with the same lazy-load guard as strict_query
+
+    Objects already in the session's identity map are returned without a query.
+    """
+    options = [raiseload("*")] if settings.debug else None
+    return db.get(model, ident, options=options)
+
+
+@lru_cache(maxsize=None)
+def response_columns(model, schema):
+    """Loader option restricting a query to the columns a response schema exposes"""
+    columns = model.__table__.columns
+    return load_only(*[getattr(model, name) for name in schema.model_fields if name in columns])
+
+
+def upsert_insert(db: Session):
+    """The session dialect's insert(), which supports ON CONFLICT DO NOTHING"""
+    return pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+def construct_from_row(schema, row):
+    """Build a response schema from a stored ORM row without re-validating it
+
+    Read paths only: rows were validated on the way in and the column types
+    are enforced by the database. Client input keeps full validation.
+    """
+    return schema.model_construct(**{name: getattr(row, name) for name in schema.model_fields})
 
 
 def create_tables():
     """Create all database tables"""
     try:
-        from app.models.user import User
-        from app.models.requirement import Requirement
-        from app.models.listing import Listing
+        # Register every model on Base.metadata before creating
+        from app.models import user, requirement, listing, database
         Base.metadata.create_all(bind=engine)
-        # Print all table names for debug
-        with engine.connect() as conn:
-            table_names = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table';")).fetchall()
-            print(f"✅ Database tables created: {[name[0] for name in table_names]}")
+        # Listing the tables costs a query, so only do it when debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Database tables: {inspect(engine).get_table_names()}")
     except Exception as e:
-        print(f"❌ Error creating database tables: {e}")
+        logger.error(f"Error creating database tables: {e}")
         raise 
\ No newline at end of file
@@ -4,50 +4,63 @@ FastAPI application entry point
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from datetime import datetime
+import logging
+import anyio
 
-from .database import create_tables
+from .config.settings import settings
+from .database import create_tables, warm_pool
 from .api import auth, requirements, listings, messages, scraper, parser, valuation, scheduler
 
+logging.basicConfig(level=settings.log_level.upper())
+logger = logging.getLogger(__name__)
 
-print("🚀 Starting BuySmart backend...")
-
-try:
-    from app.models import user, requirement, listing
-    print("✅ Models imported")
-except Exception as e:
-    print("❌ Model import failed:", e)
-    raise
+logger.info("Starting BuySmart backend...")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
-    print("✅ Database initialized")
+    # Sync endpoints block a worker thread for each DB round-trip, so size the
+    # threadpool for the expected number of concurrent requests
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.worker_threads
+    # The schema is normally created once by hand (see DEPLOYMENT.md); running
+    # create_all on every boot costs a catalog lookup per table
+    if settings.create_tables_on_startup:
+        await anyio.to_thread.run_sync(create_tables)
+    await anyio.to_thread.run_sync(warm_pool)
+    logger.info("Database initialized")
     
     yield
     
     # Shutdown
-    print("🛑 Shutting down BuySmart backend...")
+    logger.info("Shutting down BuySmart backend...")
 
 
 app = FastAPI(
     title="BuySmart API",
     description="API for BuySmart - OLX India buyer assistance",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# CORS middleware
+# Vite dev server ports. CORSMiddleware only tests membership, so a
+# frozenset makes the per-request origin check a hash lookup.
+ALLOWED_ORIGINS = frozenset(f"http://localhost:{port}" for port in range(5173, 5178))
+
+# CORS middleware. Explicit method and header lists let preflights be
+# checked against fixed sets instead of echoing whatever the browser asks for.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:5174", "http://localhost:5175", "http://localhost:5176", "http://localhost:5177"],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["authorization", "content-type", "if-none-match"],
+    expose_headers=["etag"],
 )
 
 # Include routers
@@ -73,18 +86,18 @@ async def root():
 
 @app.get("/health")
 def health():
-    print("✅ /health endpoint hit")
     return {"status": "ok"}
 
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
-    return JSONResponse(
+    # orjson writes the datetime as ISO 8601 itself
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Internal server error",
             "error": str(exc),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow()
         }
     ) 
\ No newline at end of file
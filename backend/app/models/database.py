@@ -2,22 +2,24 @@
 Additional database models
 """
 
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, JSON, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
-import uuid
 
-from ..database import Base
+from ..database import Base, GUID, new_id
 from ..enums import MessageType
 
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Conversation history is read per listing in chronological order
+        Index("ix_messages_listing_id_created_at", "listing_id", "created_at"),
+    )
 
-    # Use String(36) for SQLite compatibility
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    listing_id = Column(String(36), ForeignKey("listings.id"), nullable=False)
+    id = Column(GUID(), primary_key=True, default=new_id)
+    listing_id = Column(GUID(), ForeignKey("listings.id"), nullable=False)
     message_type = Column(SQLEnum(MessageType), nullable=False)
     content = Column(Text, nullable=False)
     response_content = Column(Text, nullable=True)
@@ -37,9 +39,8 @@ class Message(Base):
 class ParsedResponse(Base):
     __tablename__ = "parsed_responses"
 
-    # Use String(36) for SQLite compatibility
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    listing_id = Column(String(36), ForeignKey("listings.id"), nullable=False)
+    id = Column(GUID(), primary_key=True, default=new_id)
+    listing_id = Column(GUID(), ForeignKey("listings.id"), nullable=False)
     response_text = Column(Text, nullable=False)
     parsed_data = Column(JSON, nullable=True)
     sentiment = Column(String(50), nullable=True)
@@ -53,4 +54,10 @@ class ParsedResponse(Base):
     listing = relationship("Listing", back_populates="parsed_response")
 
     def __repr__(self):
-        return f"<ParsedResponse(id={self.id}, listing_id={self.listing_id})>" 
\ No newline at end of file
+        return f"<ParsedResponse(id={self.id}, listing_id={self.listing_id})>" 
+
+# Older code and the test suite import every model from this module
+from .user import User  # noqa: E402
+from .requirement import Requirement  # noqa: E402
+from .listing import Listing  # noqa: E402
+from ..enums import Category, RequirementStatus, Timeline as RequirementTimeline  # noqa: E402
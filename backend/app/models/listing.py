@@ -2,23 +2,28 @@
 Listing model for scraped listings
 """
 
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Text, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Text, JSON, Index, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
-import uuid
-from sqlalchemy.ext.mutable import MutableList
 
-from ..database import Base
+from ..database import Base, GUID, new_id
 from ..enums import ListingStatus
 
 
 class Listing(Base):
     __tablename__ = "listings"
+    __table_args__ = (
+        # Listings are read per requirement, optionally narrowed by status;
+        # the leading column also serves plain requirement_id lookups
+        Index("ix_listings_requirement_id_status", "requirement_id", "status"),
+        # One row per OLX listing per requirement, so re-scrapes can skip
+        # listings already stored
+        UniqueConstraint("requirement_id", "external_id", name="uq_listings_requirement_id_external_id"),
+    )
 
-    # Use String(36) for SQLite compatibility
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    requirement_id = Column(String(36), ForeignKey("requirements.id"), nullable=False)
+    id = Column(GUID(), primary_key=True, default=new_id)
+    requirement_id = Column(GUID(), ForeignKey("requirements.id"), nullable=False)
     external_id = Column(String(255), nullable=False)  # OLX listing ID
     title = Column(String(500), nullable=False)
     description = Column(Text, nullable=True)
@@ -28,7 +33,8 @@ class Listing(Base):
     seller_name = Column(String(255), nullable=True)
     seller_rating = Column(Float, nullable=True)
     listing_url = Column(String(1000), nullable=False)
-    image_urls = Column(MutableList.as_mutable(JSON), nullable=True, default=list)
+    # Always replaced wholesale, never edited in place, so no mutation tracking
+    image_urls = Column(JSON, nullable=True, default=list)
     condition = Column(String(100), nullable=True)
     status = Column(SQLEnum(ListingStatus), nullable=False, default=ListingStatus.ACTIVE)
     
@@ -2,30 +2,54 @@
 Requirement model for user requirements
 """
 
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, JSON, Index, text, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime, timedelta
-import uuid
 from sqlalchemy.ext.mutable import MutableList
 
-from ..database import Base
+from ..database import Base, GUID, new_id
 from ..enums import Category, RequirementStatus, ScrapingStatus, Timeline
 
+# Binary JSONB on Postgres (parsed server-side and GIN-indexable), plain JSON elsewhere
+JSON_LIST = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Requirement(Base):
     __tablename__ = "requirements"
+    __table_args__ = (
+        # Requirements are always scoped to a user and listed newest first
+        Index("ix_requirements_user_id_created_at", "user_id", "created_at"),
+        # The scrape scheduler polls for active requirements with next_scrape_at <= now.
+        # Postgres gets a partial index holding only schedulable rows; SQLite
+        # can't match a partial index against a bound parameter, so it gets a
+        # composite with the equality column first.
+        Index(
+            "ix_requirements_due_for_scrape", "next_scrape_at",
+            postgresql_where=text("status = 'ACTIVE' AND next_scrape_at IS NOT NULL")
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_requirements_status_next_scrape_at", "status", "next_scrape_at").ddl_if(dialect="sqlite"),
+        # Containment lookups (deal_breakers @> '["cracked screen"]') on Postgres
+        Index(
+            "ix_requirements_deal_breakers_gin", "deal_breakers",
+            postgresql_using="gin", postgresql_ops={"deal_breakers": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_requirements_condition_preferences_gin", "condition_preferences",
+            postgresql_using="gin", postgresql_ops={"condition_preferences": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
-    # Use String(36) for SQLite compatibility
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    id = Column(GUID(), primary_key=True, default=new_id)
+    user_id = Column(GUID(), ForeignKey("users.id"), nullable=False)
     product_query = Column(String(500), nullable=False)
     category = Column(SQLEnum(Category), nullable=False)
     budget_min = Column(Float, nullable=True)
     budget_max = Column(Float, nullable=True)
     timeline = Column(SQLEnum(Timeline), nullable=False, default=Timeline.FLEXIBLE)
-    deal_breakers = Column(MutableList.as_mutable(JSON), default=list)
-    condition_preferences = Column(MutableList.as_mutable(JSON), default=list)
+    deal_breakers = Column(MutableList.as_mutable(JSON_LIST), default=list)
+    condition_preferences = Column(MutableList.as_mutable(JSON_LIST), default=list)
     status = Column(SQLEnum(RequirementStatus), nullable=False, default=RequirementStatus.ACTIVE)
     
     # Scraping fields
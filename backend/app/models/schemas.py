@@ -2,14 +2,25 @@
 Pydantic schemas for API requests and responses
 """
 
-from pydantic import BaseModel, Field, validator, field_validator
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
-import json
+import orjson
 
 from ..enums import Category, RequirementStatus, ScrapingStatus, Timeline, ListingStatus, MessageType
 
 
+def coerce_json_list(v):
+    """Accept a list field sent as a JSON-encoded string; anything but a JSON list becomes []"""
+    if isinstance(v, (str, bytes, bytearray)):
+        try:
+            parsed = orjson.loads(v)
+        except orjson.JSONDecodeError:
+            return []
+        return parsed if isinstance(parsed, list) else []
+    return v
+
+
 # User schemas
 class UserBase(BaseModel):
     email: str
@@ -38,25 +49,7 @@ class RequirementBase(BaseModel):
     deal_breakers: List[str] = Field(default_factory=list)
     condition_preferences: List[str] = Field(default_factory=list)
 
-    @field_validator("deal_breakers", mode="before")
-    @classmethod
-    def coerce_deal_breakers(cls, v):
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except Exception:
-                return []
-        return v
-
-    @field_validator("condition_preferences", mode="before")
-    @classmethod
-    def coerce_condition_preferences(cls, v):
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except Exception:
-                return []
-        return v
+    _coerce_lists = field_validator("deal_breakers", "condition_preferences", mode="before")(coerce_json_list)
 
 
 class RequirementCreate(RequirementBase):
@@ -90,6 +83,11 @@ class RequirementOut(RequirementBase):
         from_attributes = True
 
 
+class RequirementsResponse(BaseModel):
+    requirements: list[RequirementOut]
+    total: int
+
+
 # Listing schemas
 class ListingBase(BaseModel):
     external_id: str
@@ -104,18 +102,7 @@ class ListingBase(BaseModel):
     image_urls: List[str] = Field(default_factory=list)
     condition: Optional[str] = None
 
-    @validator('image_urls', pre=True)
-    def ensure_image_urls_list(cls, v):
-        if isinstance(v, str):
-            import json
-            try:
-                parsed = json.loads(v)
-                if isinstance(parsed, list):
-                    return parsed
-            except Exception:
-                pass
-            return []
-        return v
+    _coerce_image_urls = field_validator("image_urls", mode="before")(coerce_json_list)
 
 
 class ListingCreate(ListingBase):
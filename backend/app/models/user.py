@@ -6,16 +6,14 @@ from sqlalchemy import Column, String, DateTime, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
-import uuid
 
-from ..database import Base
+from ..database import Base, GUID, new_id
 
 
 class User(Base):
     __tablename__ = "users"
 
-    # Use String(36) for SQLite compatibility
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID(), primary_key=True, default=new_id)
     email = Column(String(255), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     oauth_provider = Column(String(50), nullable=True)
@@ -0,0 +1,247 @@
+"""
+Caching helpers
+In-process caches for expensive scraping and OpenAI results, and a Redis
+cache for serialized API responses
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import anyio
+import orjson
+import redis
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire a fixed number of seconds after being set
+
+    Safe to share between the event loop and threadpool workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key, evicting the least recently used entry when full
+
+        ttl overrides the cache-wide lifetime for this entry.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a listing URL for use as a cache key"""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+
+# Seconds to stop trying Redis after it fails, so an outage costs one connect
+# timeout per cooldown rather than one per request
+REDIS_RETRY_COOLDOWN = 30
+
+_redis_client: Optional[redis.Redis] = None
+_redis_retry_at = 0.0
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Shared Redis client, or None while Redis is considered unavailable"""
+    global _redis_client
+    if time.monotonic() < _redis_retry_at:
+        return None
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.redis_url,
+            socket_timeout=0.1,
+            socket_connect_timeout=0.1
+        )
+    return _redis_client
+
+
+def mark_redis_unavailable(error: Exception) -> None:
+    """Stop using Redis for REDIS_RETRY_COOLDOWN seconds after a failure"""
+    global _redis_retry_at
+    logger.warning(f"Redis unavailable, bypassing it for {REDIS_RETRY_COOLDOWN}s: {error}")
+    _redis_retry_at = time.monotonic() + REDIS_RETRY_COOLDOWN
+
+
+class UserResponseCache:
+    """Serialized JSON responses in Redis, kept in one hash per user
+
+    Each entry stores the response body with its ETag. Any write to the
+    user's data drops the whole hash, and the TTL bounds staleness for writes
+    that bypass invalidation. When Redis is down every lookup is a miss.
+    """
+
+    def __init__(self, namespace: str, ttl: int):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.namespace}:{user_id}"
+
+    def get(self, user_id: str, entry: str) -> Optional[Tuple[str, bytes]]:
+        """Return (etag, body) for a cached entry"""
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            etag, body = client.hmget(self._key(user_id), [f"{entry}:etag", f"{entry}:body"])
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+            return None
+        if etag is None or body is None:
+            return None
+        return etag.decode(), body
+
+    def set(self, user_id: str, entry: str, etag: str, body: bytes) -> None:
+        client = get_redis()
+        if client is None:
+            return
+        key = self._key(user_id)
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(key, mapping={f"{entry}:etag": etag, f"{entry}:body": body})
+            pipe.expire(key, self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+
+    def reset(self, user_id: str, entry: str, etag: str, body: bytes) -> None:
+        """Drop a user's cached responses and seed one fresh entry, in one round-trip"""
+        client = get_redis()
+        if client is None:
+            return
+        key = self._key(user_id)
+        try:
+            pipe = client.pipeline(transaction=True)
+            pipe.delete(key)
+            pipe.hset(key, mapping={f"{entry}:etag": etag, f"{entry}:body": body})
+            pipe.expire(key, self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop every cached response for a user"""
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            client.delete(self._key(user_id))
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+
+
+class SharedJSONCache:
+    """JSON-serializable results in Redis, shared by every user
+
+    For slow, user-independent lookups such as OpenAI market summaries. Keys
+    are case and whitespace insensitive, and Redis being down is a miss.
+    Coroutines use the a-prefixed methods, which run the blocking client in
+    a worker thread instead of on the event loop.
+    """
+
+    def __init__(self, namespace: str, ttl: int):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, parts: Tuple[Any, ...]) -> str:
+        normalized = orjson.dumps([str(part).strip().lower() for part in parts])
+        return f"{self.namespace}:{hashlib.blake2b(normalized, digest_size=16).hexdigest()}"
+
+    def get(self, *parts: Any) -> Optional[Any]:
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            cached = client.get(self._key(parts))
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+            return None
+        return orjson.loads(cached) if cached is not None else None
+
+    def get_many(self, keys: List[Tuple[Any, ...]]) -> List[Optional[Any]]:
+        """Look up several entries, each given as its key parts, in one MGET"""
+        client = get_redis()
+        if client is None or not keys:
+            return [None] * len(keys)
+        try:
+            cached = client.mget([self._key(parts) for parts in keys])
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+            return [None] * len(keys)
+        return [orjson.loads(value) if value is not None else None for value in cached]
+
+    def set(self, value: Any, *parts: Any) -> None:
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            client.set(self._key(parts), orjson.dumps(value), ex=self.ttl)
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+
+    def set_many(self, items: List[Tuple[Any, Tuple[Any, ...]]]) -> None:
+        """Store several (value, key parts) entries in one pipelined round-trip"""
+        client = get_redis()
+        if client is None or not items:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for value, parts in items:
+                pipe.set(self._key(parts), orjson.dumps(value), ex=self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+
+    async def aget(self, *parts: Any) -> Optional[Any]:
+        return await anyio.to_thread.run_sync(self.get, *parts)
+
+    async def aget_many(self, keys: List[Tuple[Any, ...]]) -> List[Optional[Any]]:
+        return await anyio.to_thread.run_sync(self.get_many, keys)
+
+    async def aset(self, value: Any, *parts: Any) -> None:
+        await anyio.to_thread.run_sync(self.set, value, *parts)
+
+    async def aset_many(self, items: List[Tuple[Any, Tuple[Any, ...]]]) -> None:
+        await anyio.to_thread.run_sync(self.set_many, items)
+
+
+requirements_cache = UserResponseCache("reqs", ttl=settings.response_cache_ttl)
+market_insights_cache = SharedJSONCache("market_insights", ttl=3600)
+listing_analysis_cache = SharedJSONCache("listing_analysis", ttl=86400)
+key_information_cache = SharedJSONCache("key_information", ttl=86400)
@@ -0,0 +1,31 @@
+"""
+Shared OpenAI client
+Created on first use, so importing the app neither loads the SDK nor needs an API key
+"""
+
+import asyncio
+from functools import lru_cache
+
+from ..config.settings import settings
+
+
+@lru_cache(maxsize=None)
+def get_openai_client():
+    """AsyncOpenAI client shared by the parser and valuation services"""
+    # Deferred import: the SDK accounts for a large share of cold-start time
+    import openai
+    # The SDK retries 408/409/429/5xx responses and connection errors with
+    # jittered exponential backoff, honouring Retry-After; the default two
+    # attempts are too few to ride out a rate-limit burst
+    return openai.AsyncOpenAI(api_key=settings.openai_api_key, max_retries=settings.openai_max_retries)
+
+
+# Caps OpenAI requests in flight across the process, however many batches and
+# endpoints issue them, so bursts queue here instead of coming back as 429s
+_request_slots = asyncio.Semaphore(settings.openai_max_concurrency)
+
+
+async def create_chat_completion(**kwargs):
+    """chat.completions.create on the shared client, once a request slot is free"""
+    async with _request_slots:
+        return await get_openai_client().chat.completions.create(**kwargs)
@@ -3,24 +3,103 @@ Parser Service for analyzing listing responses
 Uses OpenAI API to extract structured data from listing text
 """
 
+import asyncio
 import logging
+import orjson
 from typing import List, Dict, Optional, Any
 from datetime import datetime
-import openai
 from ..config.settings import settings
+from .cache import key_information_cache, listing_analysis_cache
+from .openai_client import create_chat_completion, get_openai_client
 from ..models.listing import Listing
 
 logger = logging.getLogger(__name__)
 
-# Configure OpenAI
-openai.api_key = settings.openai_api_key
+# Cheaper and faster than gpt-3.5-turbo, and supports JSON mode
+ANALYSIS_MODEL = "gpt-4o-mini"
+
+# Part of every cached result's key; bump it when a prompt or the model
+# changes so results from the old one are not served
+PROMPT_VERSION = 3
+
+# System prompts are module constants so every request sends an identical
+# prefix, which OpenAI's prompt caching can reuse; the listing text always
+# goes last, in the user message
+ANALYSIS_SYSTEM_PROMPT = """You are an expert at analyzing online marketplace listings.
+Extract structured information from the listing text and provide insights.
+
+Return a JSON object with the following structure:
+{
+    "product_type": "string",
+    "brand": "string or null",
+    "model": "string or null",
+    "condition": "new/used/refurbished",
+    "price_analysis": {
+        "is_negotiable": boolean,
+        "price_range": "low/medium/high",
+        "market_value": "estimated market value"
+    },
+    "seller_analysis": {
+        "seller_type": "individual/dealer",
+        "response_time": "fast/medium/slow",
+        "reliability_score": 1-10
+    },
+    "listing_quality": {
+        "photos_count": number,
+        "description_quality": "poor/fair/good/excellent",
+        "completeness_score": 1-10
+    },
+    "red_flags": ["list of potential issues"],
+    "recommendations": ["list of suggestions"]
+}"""
+
+# Same prefix as ANALYSIS_SYSTEM_PROMPT, so both share OpenAI's prompt cache
+BATCH_ANALYSIS_SYSTEM_PROMPT = ANALYSIS_SYSTEM_PROMPT + """
+
+You will be given several listings, each introduced by a tag such as [[1]].
+Return a JSON object {"results": [...]} with one object of the structure above
+per listing, in the order given, each with an extra "listing" field holding
+the listing's tag number."""
+
+# Listings sent per batch analysis request; each gets up to 1000 output tokens.
+# gpt-4o-mini's 16k output limit would allow far more, but small groups keep
+# each reply fast, run in parallel, and lose only a few analyses when one is
+# truncated or malformed.
+ANALYSIS_BATCH_SIZE = 4
+
+KEY_INFORMATION_SYSTEM_PROMPT = """Extract key information from this listing in JSON format:
+{
+    "product_name": "string",
+    "price": "number or null",
+    "condition": "new/used/refurbished",
+    "location": "string",
+    "seller_type": "individual/dealer",
+    "key_features": ["list of key features"],
+    "urgency": "low/medium/high"
+}"""
+
+COMPARISON_SYSTEM_PROMPT = """Compare these listings and provide insights in JSON format:
+{
+    "best_value": "listing number with best value",
+    "price_comparison": "analysis of price differences",
+    "quality_comparison": "analysis of listing quality",
+    "recommendations": ["list of recommendations"],
+    "market_insights": "overall market analysis"
+}"""
 
 
 class ParserService:
     """Service for parsing and analyzing listing data using OpenAI"""
     
     def __init__(self):
-        self.client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+        # Analyses in progress, by listing text, so concurrent requests for
+        # the same listing share one OpenAI call
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    @property
+    def client(self):
+        """Shared AsyncOpenAI client, created on first use"""
+        return get_openai_client()
     
     async def analyze_listing(self, listing_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -62,15 +141,30 @@ class ParserService:
         Returns:
             List of analyzed listings
         """
-        analyzed_listings = []
+        # Listings go to OpenAI ANALYSIS_BATCH_SIZE per request, so the system
+        # prompt and request overhead are paid once per group; the groups run
+        # concurrently, capped process-wide by create_chat_completion
+        texts = [self._prepare_text_content(listing) for listing in listings]
+        batches = await asyncio.gather(
+            *(self._analyze_batch(texts[start:start + ANALYSIS_BATCH_SIZE])
+              for start in range(0, len(texts), ANALYSIS_BATCH_SIZE)),
+            return_exceptions=True
+        )
         
-        for listing in listings:
-            try:
-                analyzed = await self.analyze_listing(listing)
-                analyzed_listings.append(analyzed)
-            except Exception as e:
-                logger.error(f"Error analyzing listing {listing.get('url', 'unknown')}: {e}")
+        analyses = []
+        for start, batch in zip(range(0, len(texts), ANALYSIS_BATCH_SIZE), batches):
+            if isinstance(batch, Exception):
+                logger.error(f"Error analyzing listings {start}-{start + ANALYSIS_BATCH_SIZE - 1}: {batch}")
+                batch = [None] * len(texts[start:start + ANALYSIS_BATCH_SIZE])
+            analyses.extend(batch)
+        
+        parsed_at = datetime.utcnow().isoformat()
+        analyzed_listings = []
+        for listing, analysis in zip(listings, analyses):
+            if analysis is None:
                 analyzed_listings.append(listing)  # Keep original if analysis fails
+            else:
+                analyzed_listings.append({**listing, "analysis": analysis, "parsed_at": parsed_at})
         
         return analyzed_listings
     
@@ -106,40 +200,37 @@ class ParserService:
         return "\n".join(content_parts)
     
     async def _analyze_with_openai(self, text_content: str) -> Dict[str, Any]:
-        """Analyze text content using OpenAI API"""
+        """Analyze text content using OpenAI API
+
+        Callers asking for a listing that is already being analyzed wait for
+        that result instead of starting a second request. The shared request
+        is shielded, so one caller being cancelled doesn't cancel it for the
+        others.
+        """
+        task = self._inflight.get(text_content)
+        if task is None:
+            task = asyncio.ensure_future(self._request_analysis(text_content))
+            self._inflight[text_content] = task
+            task.add_done_callback(lambda _: self._inflight.pop(text_content, None))
+        return await asyncio.shield(task)
+    
+    async def _request_analysis(self, text_content: str) -> Dict[str, Any]:
+        """Analyze text content with one OpenAI call
+
+        Results are cached by listing text, so re-analyzing an unchanged
+        listing costs a Redis lookup rather than an OpenAI call.
+        """
+        cached = await listing_analysis_cache.aget(PROMPT_VERSION, text_content)
+        if cached is not None:
+            return cached
+        
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await create_chat_completion(
+                model=ANALYSIS_MODEL,
                 messages=[
                     {
                         "role": "system",
-                        "content": """You are an expert at analyzing online marketplace listings. 
-                        Extract structured information from the listing text and provide insights.
-                        
-                        Return a JSON object with the following structure:
-                        {
-                            "product_type": "string",
-                            "brand": "string or null",
-                            "model": "string or null",
-                            "condition": "new/used/refurbished",
-                            "price_analysis": {
-                                "is_negotiable": boolean,
-                                "price_range": "low/medium/high",
-                                "market_value": "estimated market value"
-                            },
-                            "seller_analysis": {
-                                "seller_type": "individual/dealer",
-                                "response_time": "fast/medium/slow",
-                                "reliability_score": 1-10
-                            },
-                            "listing_quality": {
-                                "photos_count": number,
-                                "description_quality": "poor/fair/good/excellent",
-                                "completeness_score": 1-10
-                            },
-                            "red_flags": ["list of potential issues"],
-                            "recommendations": ["list of suggestions"]
-                        }"""
+                        "content": ANALYSIS_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -147,16 +238,17 @@ class ParserService:
                     }
                 ],
                 temperature=0.3,
-                max_tokens=1000
+                max_tokens=1000,
+                response_format={"type": "json_object"}
             )
             
             # Parse response
             content = response.choices[0].message.content
-            import json
             try:
-                analysis = json.loads(content)
+                analysis = orjson.loads(content)
+                await listing_analysis_cache.aset(analysis, PROMPT_VERSION, text_content)
                 return analysis
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 logger.warning("Failed to parse OpenAI response as JSON")
                 return {"error": "Failed to parse analysis"}
                 
@@ -164,6 +256,62 @@ class ParserService:
             logger.error(f"OpenAI API error: {e}")
             return {"error": str(e)}
     
+    async def _analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyze several listing texts in one OpenAI request
+
+        Returns one analysis per text, in order. Cached texts are not sent,
+        and a listing the model leaves out of its answer gets an error entry.
+        """
+        analyses = await listing_analysis_cache.aget_many([(PROMPT_VERSION, text) for text in texts])
+        pending = [i for i, analysis in enumerate(analyses) if analysis is None]
+        if len(pending) == 1:
+            analyses[pending[0]] = await self._analyze_with_openai(texts[pending[0]])
+        if len(pending) <= 1:
+            return analyses
+        
+        listings_text = "\n\n".join(f"[[{tag}]]\n{texts[i]}" for tag, i in enumerate(pending, 1))
+        try:
+            response = await create_chat_completion(
+                model=ANALYSIS_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": BATCH_ANALYSIS_SYSTEM_PROMPT
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Analyze these OLX listings:\n\n{listings_text}"
+                    }
+                ],
+                temperature=0.3,
+                max_tokens=1000 * len(pending),
+                response_format={"type": "json_object"}
+            )
+            
+            content = response.choices[0].message.content
+            results = orjson.loads(content).get("results")
+            error = "Listing missing from batch analysis"
+        except Exception as e:
+            logger.error(f"OpenAI API error in batch analysis: {e}")
+            results = None
+            error = str(e)
+        
+        by_tag = {}
+        for result in results if isinstance(results, list) else []:
+            if isinstance(result, dict) and isinstance(result.get("listing"), int):
+                by_tag[result.pop("listing")] = result
+        
+        fresh = []
+        for tag, i in enumerate(pending, 1):
+            analysis = by_tag.get(tag)
+            if analysis is None:
+                analyses[i] = {"error": error}
+            else:
+                fresh.append((analysis, (PROMPT_VERSION, texts[i])))
+                analyses[i] = analysis
+        await listing_analysis_cache.aset_many(fresh)
+        return analyses
+    
     async def extract_key_information(self, listing_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract key information from listing for quick analysis
@@ -176,22 +324,16 @@ class ParserService:
         """
         try:
             text_content = self._prepare_text_content(listing_data)
+            cached = await key_information_cache.aget(PROMPT_VERSION, text_content)
+            if cached is not None:
+                return cached
             
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await create_chat_completion(
+                model=ANALYSIS_MODEL,
                 messages=[
                     {
                         "role": "system",
-                        "content": """Extract key information from this listing in JSON format:
-                        {
-                            "product_name": "string",
-                            "price": "number or null",
-                            "condition": "new/used/refurbished",
-                            "location": "string",
-                            "seller_type": "individual/dealer",
-                            "key_features": ["list of key features"],
-                            "urgency": "low/medium/high"
-                        }"""
+                        "content": KEY_INFORMATION_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -199,14 +341,16 @@ class ParserService:
                     }
                 ],
                 temperature=0.2,
-                max_tokens=500
+                max_tokens=250,
+                response_format={"type": "json_object"}
             )
             
             content = response.choices[0].message.content
-            import json
             try:
-                return json.loads(content)
-            except json.JSONDecodeError:
+                key_information = orjson.loads(content)
+                await key_information_cache.aset(key_information, PROMPT_VERSION, text_content)
+                return key_information
+            except orjson.JSONDecodeError:
                 return {"error": "Failed to parse key information"}
                 
         except Exception as e:
@@ -231,19 +375,12 @@ class ParserService:
                 comparison_text += self._prepare_text_content(listing)
                 comparison_text += "\n\n"
             
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await create_chat_completion(
+                model=ANALYSIS_MODEL,
                 messages=[
                     {
                         "role": "system",
-                        "content": """Compare these listings and provide insights in JSON format:
-                        {
-                            "best_value": "listing number with best value",
-                            "price_comparison": "analysis of price differences",
-                            "quality_comparison": "analysis of listing quality",
-                            "recommendations": ["list of recommendations"],
-                            "market_insights": "overall market analysis"
-                        }"""
+                        "content": COMPARISON_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -251,14 +388,14 @@ class ParserService:
                     }
                 ],
                 temperature=0.3,
-                max_tokens=800
+                max_tokens=800,
+                response_format={"type": "json_object"}
             )
             
             content = response.choices[0].message.content
-            import json
             try:
-                return json.loads(content)
-            except json.JSONDecodeError:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
                 return {"error": "Failed to parse comparison"}
                 
         except Exception as e:
@@ -5,15 +5,60 @@ Handles automatic scraping and other background jobs
 
 import asyncio
 import logging
+import time
 import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
+
+import anyio
+import orjson
+import redis
+from redis.commands.core import Script
+
 from ..services.scraper import schedule_periodic_scraping
+from .cache import get_redis, mark_redis_unavailable
 
 logger = logging.getLogger(__name__)
 
-# In-memory task storage (in production, use Redis or database)
+# Tasks live in Redis so every worker and replica sees the same ones:
+#   task:{id}              hash of the task's fields, each orjson-encoded
+#   tasks:user:{user_id}   sorted set of the user's task ids by creation time
+#   tasks:status:{status}  sorted set of task ids in that status
+# Everything expires TASK_TTL seconds after the task was created.
+TASK_TTL = 86400
+TASK_STATUSES = ("queued", "running", "completed", "failed", "cancelled")
+
+# Used only while Redis is unavailable, and visible only to this process
 task_store = {}
+# Task IDs per user in creation order, so listing a user's tasks is a slice
+# rather than a scan of every task
+user_task_ids: Dict[str, List[str]] = defaultdict(list)
+
+# Cancels one of a user's queued or running tasks atomically, so a concurrent
+# status change can't be overwritten. Returns -1 if the task doesn't exist or
+# belongs to another user, 0 if it can no longer be cancelled, 1 once
+# cancelled. Registered once; the SHA is sent with EVALSHA on every call.
+_cancel_script = Script(None, b"""
+local status = redis.call('HGET', KEYS[1], 'status')
+if not status or redis.call('HGET', KEYS[1], 'user_id') ~= ARGV[2] then return -1 end
+local from
+if status == '"queued"' then from = KEYS[2]
+elseif status == '"running"' then from = KEYS[3]
+else return 0 end
+redis.call('HSET', KEYS[1], 'status', '"cancelled"', 'cancelled_at', ARGV[3])
+local score = redis.call('ZSCORE', from, ARGV[1])
+redis.call('ZREM', from, ARGV[1])
+if score then redis.call('ZADD', KEYS[4], score, ARGV[1]) end
+return 1
+""")
+
+# Seconds between the starts of periodic scraping runs
+SCRAPE_INTERVAL = 3600
+
+# Queue stats are approximate, so the aggregate is reused for a few seconds
+QUEUE_STATS_TTL = 5
+_queue_stats_cache: Optional[tuple] = None
 
 
 class SchedulerService:
@@ -48,20 +93,28 @@ class SchedulerService:
         logger.info("Scheduler stopped")
     
     async def _run_scheduler(self):
-        """Main scheduler loop"""
+        """Main scheduler loop
+
+        Runs start SCRAPE_INTERVAL apart, measured from the previous start,
+        so the time a run takes doesn't push every later run back. A run that
+        overruns the interval is followed immediately by one more, never by
+        a burst of catch-up runs.
+        """
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
         while self.running:
             try:
-                # Run periodic scraping every hour
                 await schedule_periodic_scraping()
                 
-                # Wait for 1 hour before next run
-                await asyncio.sleep(3600)  # 1 hour
+                next_run = max(next_run + SCRAPE_INTERVAL, loop.time())
+                await asyncio.sleep(next_run - loop.time())
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Error in scheduler: {e}")
                 await asyncio.sleep(300)  # Wait 5 minutes on error
+                next_run = loop.time()
 
 
 # Global scheduler instance
@@ -78,18 +131,148 @@ async def stop_scheduler():
     await scheduler_service.stop()
 
 
-# Task scheduling functions for API
+def _task_key(task_id: str) -> str:
+    return f"task:{task_id}"
+
+
+def _user_tasks_key(user_id: str) -> str:
+    return f"tasks:user:{user_id}"
+
+
+def _status_key(status: str) -> str:
+    return f"tasks:status:{status}"
+
+
+def _decode_task(fields: Dict[bytes, bytes]) -> Dict[str, Any]:
+    return {field.decode(): orjson.loads(value) for field, value in fields.items()}
+
+
+def _register_task(user_id: str, task: Dict[str, Any]) -> str:
+    """Store a new task and index it under its user and status"""
+    task_id = str(uuid.uuid4())
+    client = get_redis()
+    if client is not None:
+        created = time.time()
+        try:
+            pipe = client.pipeline(transaction=True)
+            pipe.hset(_task_key(task_id), mapping={field: orjson.dumps(value) for field, value in task.items()})
+            pipe.expire(_task_key(task_id), TASK_TTL)
+            pipe.zadd(_user_tasks_key(user_id), {task_id: created})
+            pipe.expire(_user_tasks_key(user_id), TASK_TTL)
+            pipe.zadd(_status_key(task["status"]), {task_id: created})
+            pipe.execute()
+            return task_id
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+    
+    task_store[task_id] = task
+    user_task_ids[user_id].append(task_id)
+    return task_id
+
+
+def _load_task(task_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """The task, or None if it doesn't exist or belongs to another user"""
+    client = get_redis()
+    if client is not None:
+        try:
+            fields = client.hgetall(_task_key(task_id))
+            if fields:
+                task = _decode_task(fields)
+                return task if task.get("user_id") == user_id else None
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+    
+    task = task_store.get(task_id)
+    if task is None or task["user_id"] != user_id:
+        return None
+    return task
+
+
+def _cancel_task(task_id: str, user_id: str) -> bool:
+    client = get_redis()
+    if client is not None:
+        try:
+            cancelled = _cancel_script(
+                keys=[_task_key(task_id), _status_key("queued"), _status_key("running"), _status_key("cancelled")],
+                args=[task_id, orjson.dumps(user_id), orjson.dumps(datetime.utcnow())],
+                client=client
+            )
+            if cancelled >= 0:
+                return bool(cancelled)
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+    
+    task = task_store.get(task_id)
+    if task is None or task["user_id"] != user_id:
+        return False
+    
+    if task["status"] in ["queued", "running"]:
+        task["status"] = "cancelled"
+        task["cancelled_at"] = datetime.utcnow()
+        return True
+    
+    return False
+
+
+def _user_task_page(user_id: str, limit: int, offset: int) -> tuple:
+    client = get_redis()
+    if client is not None:
+        key = _user_tasks_key(user_id)
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.zremrangebyscore(key, "-inf", time.time() - TASK_TTL)
+            pipe.zcard(key)
+            pipe.zrevrange(key, offset, offset + limit - 1)
+            _, total, page = pipe.execute()
+            
+            pipe = client.pipeline(transaction=False)
+            for task_id in page:
+                pipe.hgetall(_task_key(task_id.decode()))
+            tasks = [
+                {"task_id": task_id.decode(), **_decode_task(fields)}
+                for task_id, fields in zip(page, pipe.execute()) if fields
+            ]
+            return tasks, total
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+    
+    task_ids = user_task_ids.get(user_id, [])
+    end = max(len(task_ids) - offset, 0)
+    page = task_ids[max(end - limit, 0):end]
+    tasks = [{"task_id": task_id, **task_store[task_id]} for task_id in reversed(page)]
+    return tasks, len(task_ids)
+
+
+def _task_counts() -> Dict[str, int]:
+    counts = defaultdict(int)
+    client = get_redis()
+    if client is not None:
+        try:
+            # Two commands per status, not a read of every task
+            pipe = client.pipeline(transaction=False)
+            for status in TASK_STATUSES:
+                pipe.zremrangebyscore(_status_key(status), "-inf", time.time() - TASK_TTL)
+                pipe.zcard(_status_key(status))
+            counts.update(zip(TASK_STATUSES, pipe.execute()[1::2]))
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+    for task in task_store.values():
+        counts[task["status"]] += 1
+    return counts
+
+
+# Task scheduling functions for API. Redis is reached through the blocking
+# client, so each call runs in a worker thread rather than on the event loop.
 async def schedule_search_task(requirement_id: str, user_id: str) -> str:
     """Schedule a search task for a requirement"""
-    task_id = str(uuid.uuid4())
-    task_store[task_id] = {
+    task_id = await anyio.to_thread.run_sync(_register_task, user_id, {
         "type": "search",
         "status": "queued",
         "requirement_id": requirement_id,
         "user_id": user_id,
         "created_at": datetime.utcnow(),
         "result": None
-    }
+    })
     
     # In a real implementation, this would queue the task
     logger.info(f"Scheduled search task {task_id} for requirement {requirement_id}")
@@ -98,15 +281,14 @@ async def schedule_search_task(requirement_id: str, user_id: str) -> str:
 
 async def schedule_analysis_task(listing_ids: List[str], user_id: str) -> str:
     """Schedule an analysis task for listings"""
-    task_id = str(uuid.uuid4())
-    task_store[task_id] = {
+    task_id = await anyio.to_thread.run_sync(_register_task, user_id, {
         "type": "analysis",
         "status": "queued",
         "listing_ids": listing_ids,
         "user_id": user_id,
         "created_at": datetime.utcnow(),
         "result": None
-    }
+    })
     
     # In a real implementation, this would queue the task
     logger.info(f"Scheduled analysis task {task_id} for {len(listing_ids)} listings")
@@ -115,39 +297,59 @@ async def schedule_analysis_task(listing_ids: List[str], user_id: str) -> str:
 
 async def schedule_valuation_task(listing_ids: List[str], user_id: str) -> str:
     """Schedule a valuation task for listings"""
-    task_id = str(uuid.uuid4())
-    task_store[task_id] = {
+    task_id = await anyio.to_thread.run_sync(_register_task, user_id, {
         "type": "valuation",
         "status": "queued",
         "listing_ids": listing_ids,
         "user_id": user_id,
         "created_at": datetime.utcnow(),
         "result": None
-    }
+    })
     
     # In a real implementation, this would queue the task
     logger.info(f"Scheduled valuation task {task_id} for {len(listing_ids)} listings")
     return task_id
 
 
-async def get_task_status(task_id: str) -> Dict[str, Any]:
-    """Get status of a task"""
-    if task_id not in task_store:
+async def get_task_status(task_id: str, user_id: str) -> Dict[str, Any]:
+    """Get status of one of the user's tasks"""
+    task = await anyio.to_thread.run_sync(_load_task, task_id, user_id)
+    if task is None:
         raise ValueError(f"Task {task_id} not found")
     
-    return task_store[task_id]
+    return task
 
 
-async def cancel_task(task_id: str) -> bool:
-    """Cancel a task"""
-    if task_id not in task_store:
-        return False
-    
-    task = task_store[task_id]
-    if task["status"] in ["queued", "running"]:
-        task["status"] = "cancelled"
-        task["cancelled_at"] = datetime.utcnow()
+async def cancel_task(task_id: str, user_id: str) -> bool:
+    """Cancel one of the user's tasks"""
+    cancelled = await anyio.to_thread.run_sync(_cancel_task, task_id, user_id)
+    if cancelled:
         logger.info(f"Cancelled task {task_id}")
-        return True
+    return cancelled
+
+
+async def list_tasks_for_user(user_id: str, limit: int, offset: int) -> tuple:
+    """Return a page of the user's tasks, newest first, and their total count"""
+    return await anyio.to_thread.run_sync(_user_task_page, user_id, limit, offset)
+
+
+async def get_queue_stats() -> Dict[str, Any]:
+    """Counts of tasks by status, recomputed at most every QUEUE_STATS_TTL seconds"""
+    global _queue_stats_cache
+    now = time.monotonic()
+    if _queue_stats_cache and _queue_stats_cache[0] > now:
+        return _queue_stats_cache[1]
     
-    return False 
\ No newline at end of file
+    counts = await anyio.to_thread.run_sync(_task_counts)
+    stats = {
+        "total_jobs": sum(counts.values()),
+        "queued_jobs": counts["queued"],
+        "running_jobs": counts["running"],
+        "completed_jobs": counts["completed"],
+        "failed_jobs": counts["failed"],
+        "cancelled_jobs": counts["cancelled"],
+        "workers": 1 if scheduler_service.running else 0,
+        "queue_name": "buysmart_tasks"
+    }
+    _queue_stats_cache = (now + QUEUE_STATS_TTL, stats)
+    return stats
@@ -3,78 +3,169 @@ Scraping service for OLX listings
 """
 
 import asyncio
+import hashlib
 import logging
+import anyio
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import func
 from typing import List, Optional
 
-from ..database import SessionLocal
+from ..config.settings import settings
+from ..database import SessionLocal, strict_get, upsert_insert
 from ..models.requirement import Requirement
 from ..models.listing import Listing
-from ..enums import ScrapingStatus
+from ..enums import RequirementStatus, ScrapingStatus
+from .cache import normalize_url, requirements_cache
 
 logger = logging.getLogger(__name__)
 
+# Caps scrapes in flight across the process, however many requests queue them
+_scrape_slots = asyncio.Semaphore(settings.max_concurrent_scrapes)
+
+
+def _start_scraping(requirement_id: str) -> Optional[tuple]:
+    """Mark a requirement as being scraped and return its (query, category)"""
+    db = SessionLocal()
+    try:
+        requirement = strict_get(db, Requirement, requirement_id)
+        if not requirement:
+            return None
+        
+        # Update scraping status to in_progress
+        requirement.update_scraping_status(ScrapingStatus.IN_PROGRESS)
+        search_args = (requirement.product_query, requirement.category.value)
+        user_id = requirement.user_id
+        db.commit()
+        requirements_cache.invalidate(user_id)
+        return search_args
+    finally:
+        db.close()
+
+
+# Rows per INSERT executemany when saving a scrape
+INSERT_CHUNK_SIZE = 1000
+
+# Requirements queued per periodic poll
+SCRAPE_POLL_BATCH = 100
+
+
+def _external_id(listing_data: dict) -> Optional[str]:
+    """The scraped listing's own id, else a stable key derived from its URL
+
+    Falling back to a shared placeholder would make every id-less listing
+    collide on the (requirement_id, external_id) constraint.
+    """
+    if listing_data.get("id"):
+        return str(listing_data["id"])
+    if listing_data.get("url"):
+        return f"url:{hashlib.blake2b(normalize_url(listing_data['url']).encode(), digest_size=16).hexdigest()}"
+    return None
+
+
+def _save_scraped_listings(requirement_id: str, listings: List[dict]) -> int:
+    """Store scraped listings and mark the requirement as completed"""
+    db = SessionLocal()
+    try:
+        # Keyed by external_id, so a listing repeated within one page is stored once
+        rows = {}
+        for listing_data in listings:
+            external_id = _external_id(listing_data)
+            if not external_id:
+                logger.warning(f"Skipping scraped listing with neither id nor url for requirement {requirement_id}")
+                continue
+            rows.setdefault(external_id, {
+                "requirement_id": requirement_id,
+                "external_id": external_id,
+                "title": listing_data.get("title", ""),
+                "description": listing_data.get("description", ""),
+                "price": listing_data.get("price"),
+                "location": listing_data.get("location", ""),
+                "seller_name": listing_data.get("seller_name", ""),
+                "listing_url": listing_data.get("url", ""),
+                "image_urls": listing_data.get("images", [])
+            })
+        rows = list(rows.values())
+        
+        # One executemany per chunk instead of an ORM flush per object. Listings
+        # the requirement already has are skipped by the unique constraint, which
+        # also keeps overlapping scrapes of the same requirement idempotent.
+        insert_listing = upsert_insert(db)(Listing).on_conflict_do_nothing(
+            index_elements=["requirement_id", "external_id"]
+        ).returning(Listing.id)
+        saved_count = 0
+        for offset in range(0, len(rows), INSERT_CHUNK_SIZE):
+            saved_count += len(db.execute(insert_listing, rows[offset:offset + INSERT_CHUNK_SIZE]).all())
+        total_count = db.query(func.count(Listing.id)).filter(
+            Listing.requirement_id == requirement_id
+        ).scalar()
+        
+        # Update requirement with success status, in the same transaction
+        user_id = None
+        requirement = strict_get(db, Requirement, requirement_id)
+        if requirement:
+            requirement.update_scraping_status(ScrapingStatus.COMPLETED, total_count)
+            user_id = requirement.user_id
+        db.commit()
+        if user_id:
+            requirements_cache.invalidate(user_id)
+        return saved_count
+    finally:
+        db.close()
+
+
+def _mark_scraping_failed(requirement_id: str):
+    """Record a failed scrape so it is retried later"""
+    db = SessionLocal()
+    try:
+        requirement = strict_get(db, Requirement, requirement_id)
+        if requirement:
+            requirement.update_scraping_status(ScrapingStatus.FAILED)
+            user_id = requirement.user_id
+            db.commit()
+            requirements_cache.invalidate(user_id)
+    finally:
+        db.close()
+
 
 async def trigger_scraping_for_requirement(requirement_id: str):
     """
     Trigger scraping for a specific requirement
     
+    Database work runs in worker threads with short-lived sessions, so the
+    event loop is never blocked on the sync driver and no connection is held
+    while the scrape itself is in flight.
+    
     Args:
         requirement_id: ID of the requirement to scrape for
     """
-    db = SessionLocal()
     try:
-        # Get requirement
-        requirement = db.query(Requirement).filter(Requirement.id == requirement_id).first()
-        if not requirement:
+        search_args = await anyio.to_thread.run_sync(_start_scraping, requirement_id)
+        if not search_args:
             logger.error(f"Requirement {requirement_id} not found")
             return
         
-        # Update scraping status to in_progress
-        requirement.update_scraping_status(ScrapingStatus.IN_PROGRESS)
-        db.commit()
-        
-        logger.info(f"Starting scraping for requirement {requirement_id}: {requirement.product_query}")
+        product_query, category = search_args
+        logger.info(f"Starting scraping for requirement {requirement_id}: {product_query}")
         
         # Perform scraping
         try:
-            listings = await search_listings(requirement.product_query, requirement.category.value)
+            listings = await search_listings(product_query, category)
+            saved_count = await anyio.to_thread.run_sync(_save_scraped_listings, requirement_id, listings)
             
-            # Save listings to database
-            saved_listings = []
-            for listing_data in listings:
-                listing = Listing(
-                    requirement_id=requirement_id,
-                    external_id=listing_data.get("id", ""),
-                    title=listing_data.get("title", ""),
-                    description=listing_data.get("description", ""),
-                    price=listing_data.get("price"),
-                    location=listing_data.get("location", ""),
-                    seller_name=listing_data.get("seller_name", ""),
-                    listing_url=listing_data.get("url", ""),
-                    image_urls=listing_data.get("images", [])
-                )
-                db.add(listing)
-                saved_listings.append(listing)
-            
-            db.commit()
-            
-            # Update requirement with success status
-            requirement.update_scraping_status(ScrapingStatus.COMPLETED, len(saved_listings))
-            db.commit()
-            
-            logger.info(f"Scraping completed for requirement {requirement_id}. Found {len(saved_listings)} listings")
+            logger.info(f"Scraping completed for requirement {requirement_id}. Found {saved_count} listings")
             
         except Exception as e:
             logger.error(f"Scraping failed for requirement {requirement_id}: {e}")
-            requirement.update_scraping_status(ScrapingStatus.FAILED)
-            db.commit()
+            await anyio.to_thread.run_sync(_mark_scraping_failed, requirement_id)
             
     except Exception as e:
         logger.error(f"Error in trigger_scraping_for_requirement: {e}")
-    finally:
-        db.close()
+
+
+async def run_bounded_scrape(requirement_id: str):
+    """Scrape a requirement once one of the limited scraping slots is free"""
+    async with _scrape_slots:
+        await trigger_scraping_for_requirement(requirement_id)
 
 
 async def search_listings(query: str, category: str) -> List[dict]:
@@ -137,24 +228,34 @@ async def get_listing_details(listing_id: str) -> Optional[dict]:
     }
 
 
+def _requirements_due_for_scraping() -> List[str]:
+    """IDs of active requirements whose next scrape time has passed, most overdue first
+
+    At most SCRAPE_POLL_BATCH per poll; the rest are picked up by the next one.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        rows = db.query(Requirement.id).filter(
+            Requirement.status == RequirementStatus.ACTIVE,
+            Requirement.next_scrape_at <= now
+        ).order_by(Requirement.next_scrape_at).limit(SCRAPE_POLL_BATCH).all()
+        return [row.id for row in rows]
+    finally:
+        db.close()
+
+
 async def schedule_periodic_scraping():
     """
     Schedule periodic scraping for all active requirements
     This should be called by a scheduler (e.g., Celery, APScheduler)
     """
-    db = SessionLocal()
     try:
         # Get all active requirements that need scraping
-        now = datetime.utcnow()
-        requirements = db.query(Requirement).filter(
-            Requirement.status == "active",
-            Requirement.next_scrape_at <= now
-        ).all()
+        requirement_ids = await anyio.to_thread.run_sync(_requirements_due_for_scraping)
         
-        for requirement in requirements:
-            await trigger_scraping_for_requirement(requirement.id)
+        for requirement_id in requirement_ids:
+            await trigger_scraping_for_requirement(requirement_id)
             
     except Exception as e:
         logger.error(f"Error in periodic scraping: {e}")
-    finally:
-        db.close() 
\ No newline at end of file
@@ -3,23 +3,69 @@ Valuation Service for estimating fair market values
 Uses OpenAI API to analyze pricing and market conditions
 """
 
+import asyncio
+import orjson
 import logging
 from typing import List, Dict, Optional, Any
 from datetime import datetime
-import openai
-from ..config.settings import settings
+from .openai_client import create_chat_completion, get_openai_client
 
 logger = logging.getLogger(__name__)
 
-# Configure OpenAI
-openai.api_key = settings.openai_api_key
+# System prompts are module constants so every request sends an identical
+# prefix, which OpenAI's prompt caching can reuse; the listing text always
+# goes last, in the user message
+VALUE_COMPARISON_SYSTEM_PROMPT = """Compare the fair market values of these listings and provide insights in JSON format:
+{
+    "best_value_deal": "listing number with best value for money",
+    "overpriced_listings": ["list of overpriced listing numbers"],
+    "fair_priced_listings": ["list of fairly priced listing numbers"],
+    "undervalued_listings": ["list of undervalued listing numbers"],
+    "price_range_analysis": "analysis of price distribution",
+    "negotiation_opportunities": ["list of listings with negotiation potential"],
+    "market_trends": "overall market pricing trends"
+}"""
+
+MARKET_INSIGHTS_SYSTEM_PROMPT = """Provide market insights for the given product and location in JSON format:
+{
+    "average_price_range": "low-high price range",
+    "price_factors": ["list of factors affecting price"],
+    "market_demand": "high/medium/low",
+    "seasonal_trends": "any seasonal price variations",
+    "negotiation_tips": ["tips for negotiating price"],
+    "red_flags": ["common issues to watch out for"],
+    "recommendations": ["general buying recommendations"]
+}"""
+
+VALUATION_SYSTEM_PROMPT = """You are an expert at valuing used products in the Indian market.
+Analyze the listing and provide a fair market value estimate.
+
+Return a JSON object with the following structure:
+{
+    "fair_market_value": "estimated fair market value in INR",
+    "value_range": {
+        "min": "minimum reasonable price",
+        "max": "maximum reasonable price"
+    },
+    "confidence_score": "1-10 confidence in the estimate",
+    "price_analysis": {
+        "is_overpriced": boolean,
+        "is_undervalued": boolean,
+        "price_difference": "difference from listed price"
+    },
+    "factors_considered": ["list of factors that influenced the valuation"],
+    "negotiation_advice": "advice for price negotiation",
+    "market_comparison": "how this compares to similar items"
+}"""
 
 
 class ValuationService:
     """Service for estimating fair market values using OpenAI"""
     
-    def __init__(self):
-        self.client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+    @property
+    def client(self):
+        """Shared AsyncOpenAI client, created on first use"""
+        return get_openai_client()
     
     async def estimate_value(self, listing_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -66,21 +112,12 @@ class ValuationService:
                 comparison_text += self._prepare_valuation_text(listing)
                 comparison_text += "\n\n"
             
-            response = await self.client.chat.completions.create(
+            response = await create_chat_completion(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
                         "role": "system",
-                        "content": """Compare the fair market values of these listings and provide insights in JSON format:
-                        {
-                            "best_value_deal": "listing number with best value for money",
-                            "overpriced_listings": ["list of overpriced listing numbers"],
-                            "fair_priced_listings": ["list of fairly priced listing numbers"],
-                            "undervalued_listings": ["list of undervalued listing numbers"],
-                            "price_range_analysis": "analysis of price distribution",
-                            "negotiation_opportunities": ["list of listings with negotiation potential"],
-                            "market_trends": "overall market pricing trends"
-                        }"""
+                        "content": VALUE_COMPARISON_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -92,10 +129,9 @@ class ValuationService:
             )
             
             content = response.choices[0].message.content
-            import json
             try:
-                return json.loads(content)
-            except json.JSONDecodeError:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
                 return {"error": "Failed to parse comparison"}
                 
         except Exception as e:
@@ -118,21 +154,12 @@ class ValuationService:
             if location:
                 prompt += f" in {location}"
             
-            response = await self.client.chat.completions.create(
+            response = await create_chat_completion(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
                         "role": "system",
-                        "content": """Provide market insights for the given product and location in JSON format:
-                        {
-                            "average_price_range": "low-high price range",
-                            "price_factors": ["list of factors affecting price"],
-                            "market_demand": "high/medium/low",
-                            "seasonal_trends": "any seasonal price variations",
-                            "negotiation_tips": ["tips for negotiating price"],
-                            "red_flags": ["common issues to watch out for"],
-                            "recommendations": ["general buying recommendations"]
-                        }"""
+                        "content": MARKET_INSIGHTS_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -144,10 +171,9 @@ class ValuationService:
             )
             
             content = response.choices[0].message.content
-            import json
             try:
-                return json.loads(content)
-            except json.JSONDecodeError:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
                 return {"error": "Failed to parse market insights"}
                 
         except Exception as e:
@@ -210,31 +236,12 @@ class ValuationService:
     async def _get_valuation_from_openai(self, valuation_text: str) -> Dict[str, Any]:
         """Get valuation from OpenAI API"""
         try:
-            response = await self.client.chat.completions.create(
+            response = await create_chat_completion(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
                         "role": "system",
-                        "content": """You are an expert at valuing used products in the Indian market. 
-                        Analyze the listing and provide a fair market value estimate.
-                        
-                        Return a JSON object with the following structure:
-                        {
-                            "fair_market_value": "estimated fair market value in INR",
-                            "value_range": {
-                                "min": "minimum reasonable price",
-                                "max": "maximum reasonable price"
-                            },
-                            "confidence_score": "1-10 confidence in the estimate",
-                            "price_analysis": {
-                                "is_overpriced": boolean,
-                                "is_undervalued": boolean,
-                                "price_difference": "difference from listed price"
-                            },
-                            "factors_considered": ["list of factors that influenced the valuation"],
-                            "negotiation_advice": "advice for price negotiation",
-                            "market_comparison": "how this compares to similar items"
-                        }"""
+                        "content": VALUATION_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -246,10 +253,9 @@ class ValuationService:
             )
             
             content = response.choices[0].message.content
-            import json
             try:
-                return json.loads(content)
-            except json.JSONDecodeError:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
                 logger.warning("Failed to parse valuation response as JSON")
                 return {"error": "Failed to parse valuation"}
                 
@@ -267,17 +273,20 @@ class ValuationService:
         Returns:
             List of listings with valuations
         """
-        valuated_listings = []
+        # Same fan-out as ParserService.analyze_multiple_listings: the OpenAI
+        # calls overlap, within create_chat_completion's process-wide cap
+        results = await asyncio.gather(
+            *(self.estimate_value(listing) for listing in listings),
+            return_exceptions=True
+        )
         
-        for listing in listings:
-            try:
-                valuation = await self.estimate_value(listing)
-                listing["valuation"] = valuation
-                valuated_listings.append(listing)
-            except Exception as e:
-                logger.error(f"Error valuating listing {listing.get('url', 'unknown')}: {e}")
-                listing["valuation"] = {"error": str(e)}
-                valuated_listings.append(listing)
+        valuated_listings = []
+        for listing, valuation in zip(listings, results):
+            if isinstance(valuation, Exception):
+                logger.error(f"Error valuating listing {listing.get('url', 'unknown')}: {valuation}")
+                valuation = {"error": str(valuation)}
+            listing["valuation"] = valuation
+            valuated_listings.append(listing)
         
         return valuated_listings
 
@@ -1,36 +0,0 @@
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, Text, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.dialects.sqlite import JSON
-from datetime import datetime
-import uuid
-
-# SQLite database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./buysmart.db"
-
-# Create engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}
-)
-
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Create Base class
-Base = declarative_base()
-
-def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def create_tables():
-    """Create all tables"""
-    # Import models here to avoid circular imports
-    from models import User, Requirement
-    
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
@@ -4,7 +4,13 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
 from app.database import get_db
-from app.models.database import Base
+from app.models.database import Base, User
+from app.services import auth, cache
+from app.services.auth import create_access_token, token_cache, verify_password, verify_token
+from datetime import timedelta
+from types import SimpleNamespace
+import bcrypt
+import time
 
 # Create test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -60,4 +66,45 @@ def test_login_invalid_credentials():
         "username": "nonexistent@example.com",
         "password": "wrongpassword"
     })
-    assert response.status_code == 401 
\ No newline at end of file
+    assert response.status_code == 401
+
+def test_login_upgrades_bcrypt_hash():
+    db = TestingSessionLocal()
+    legacy_hash = bcrypt.hashpw(b"legacypassword", bcrypt.gensalt(rounds=4)).decode()
+    db.add(User(email="legacy@example.com", password_hash=legacy_hash))
+    db.commit()
+    db.close()
+    
+    response = client.post("/api/auth/login", data={
+        "username": "legacy@example.com",
+        "password": "legacypassword"
+    })
+    assert response.status_code == 200
+    
+    db = TestingSessionLocal()
+    stored_hash = db.query(User).filter(User.email == "legacy@example.com").one().password_hash
+    db.close()
+    assert stored_hash.startswith("$argon2")
+    assert verify_password("legacypassword", stored_hash)
+
+def test_verify_token_cache_hit(monkeypatch):
+    token = create_access_token(data={"sub": "cached@example.com"})
+    assert verify_token(token).email == "cached@example.com"
+    
+    # A second lookup is answered from the cache without decoding the token
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("token decoded again")
+    monkeypatch.setattr(auth.jwt, "decode", fail_decode)
+    assert verify_token(token).email == "cached@example.com"
+
+def test_verify_token_cache_respects_exp(monkeypatch):
+    short_token = create_access_token(data={"sub": "short@example.com"}, expires_delta=timedelta(seconds=30))
+    long_token = create_access_token(data={"sub": "long@example.com"})
+    assert verify_token(short_token) is not None
+    assert verify_token(long_token) is not None
+    
+    # Past the short token's exp but within the cache's own TTL
+    now = time.monotonic()
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now + 31))
+    assert token_cache.get(short_token) is None
+    assert token_cache.get(long_token) is not None
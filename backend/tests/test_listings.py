@@ -26,6 +26,9 @@ def override_get_db():
 app.dependency_overrides[get_db] = override_get_db
 client = TestClient(app)
 
+# The router carries its own /listings prefix under the app's /api/listings mount
+LISTINGS_URL = "/api/listings/listings"
+
 def setup_module():
     from app.models.database import Base
     Base.metadata.create_all(bind=engine)
@@ -67,22 +70,23 @@ def test_create_listing():
     headers = {"Authorization": f"Bearer {token}"}
     data = {
         "requirement_id": requirement_id,
-        "olx_id": "olx123",
+        "external_id": "olx123",
         "title": "Test Listing",
+        "listing_url": "https://www.olx.in/item/1",
         "price": 150,
         "location": "Mumbai",
         "posted_date": "2024-06-01T12:00:00Z"
     }
-    response = client.post("/api/listings/", json=data, headers=headers)
+    response = client.post(f"{LISTINGS_URL}/", json=data, headers=headers)
     assert response.status_code == 200
     listing = response.json()
     assert listing["title"] == "Test Listing"
-    assert listing["olx_id"] == "olx123"
+    assert listing["external_id"] == "olx123"
 
 def test_get_listings_for_requirement():
     token, requirement_id = get_test_token_and_requirement()
     headers = {"Authorization": f"Bearer {token}"}
-    response = client.get(f"/api/listings/{requirement_id}", headers=headers)
+    response = client.get(f"{LISTINGS_URL}/{requirement_id}", headers=headers)
     assert response.status_code == 200
     data = response.json()
     assert "listings" in data
@@ -94,20 +98,21 @@ def test_get_listing():
     # Create a listing
     data = {
         "requirement_id": requirement_id,
-        "olx_id": "olx456",
+        "external_id": "olx456",
         "title": "Single Listing",
+        "listing_url": "https://www.olx.in/item/1",
         "price": 180,
         "location": "Delhi",
         "posted_date": "2024-06-01T12:00:00Z"
     }
-    create_resp = client.post("/api/listings/", json=data, headers=headers)
+    create_resp = client.post(f"{LISTINGS_URL}/", json=data, headers=headers)
     listing_id = create_resp.json()["id"]
     # Fetch it
-    response = client.get(f"/api/listings/item/{listing_id}", headers=headers)
+    response = client.get(f"{LISTINGS_URL}/item/{listing_id}", headers=headers)
     assert response.status_code == 200
     listing = response.json()
     assert listing["title"] == "Single Listing"
-    assert listing["olx_id"] == "olx456"
+    assert listing["external_id"] == "olx456"
 
 def test_update_listing():
     token, requirement_id = get_test_token_and_requirement()
@@ -115,17 +120,18 @@ def test_update_listing():
     # Create a listing
     data = {
         "requirement_id": requirement_id,
-        "olx_id": "olx789",
+        "external_id": "olx789",
         "title": "Old Title",
+        "listing_url": "https://www.olx.in/item/1",
         "price": 200,
         "location": "Bangalore",
         "posted_date": "2024-06-01T12:00:00Z"
     }
-    create_resp = client.post("/api/listings/", json=data, headers=headers)
+    create_resp = client.post(f"{LISTINGS_URL}/", json=data, headers=headers)
     listing_id = create_resp.json()["id"]
     # Update it
     update_data = {"title": "Updated Title", "price": 210}
-    response = client.patch(f"/api/listings/item/{listing_id}", json=update_data, headers=headers)
+    response = client.patch(f"{LISTINGS_URL}/item/{listing_id}", json=update_data, headers=headers)
     assert response.status_code == 200
     listing = response.json()
     assert listing["title"] == "Updated Title"
@@ -137,15 +143,119 @@ def test_delete_listing():
     # Create a listing
     data = {
         "requirement_id": requirement_id,
-        "olx_id": "olx999",
+        "external_id": "olx999",
         "title": "Delete Me",
+        "listing_url": "https://www.olx.in/item/1",
         "price": 300,
         "location": "Chennai",
         "posted_date": "2024-06-01T12:00:00Z"
     }
-    create_resp = client.post("/api/listings/", json=data, headers=headers)
+    create_resp = client.post(f"{LISTINGS_URL}/", json=data, headers=headers)
     listing_id = create_resp.json()["id"]
     # Delete it
-    response = client.delete(f"/api/listings/item/{listing_id}", headers=headers)
+    response = client.delete(f"{LISTINGS_URL}/item/{listing_id}", headers=headers)
+    assert response.status_code == 204
+    assert response.content == b""
+
+def test_create_duplicate_listing():
+    token, requirement_id = get_test_token_and_requirement()
+    headers = {"Authorization": f"Bearer {token}"}
+    data = {
+        "requirement_id": requirement_id,
+        "external_id": "olx-dup",
+        "title": "Duplicate",
+        "listing_url": "https://www.olx.in/item/1"
+    }
+    assert client.post(f"{LISTINGS_URL}/", json=data, headers=headers).status_code == 200
+    response = client.post(f"{LISTINGS_URL}/", json=data, headers=headers)
+    assert response.status_code == 409
+    assert "IntegrityError" not in response.text
+    listings = client.get(f"{LISTINGS_URL}/{requirement_id}", headers=headers).json()
+    assert listings["total"] == 1
+
+def bulk_listings(requirement_id, count):
+    return [
+        {
+            "requirement_id": requirement_id,
+            "external_id": f"olx-bulk-{i}",
+            "title": f"Bulk Listing {i}",
+            "listing_url": f"https://www.olx.in/item/bulk-{i}",
+            "price": 100 + i
+        }
+        for i in range(count)
+    ]
+
+def test_create_listings_bulk():
+    token, requirement_id = get_test_token_and_requirement()
+    headers = {"Authorization": f"Bearer {token}"}
+    batch = bulk_listings(requirement_id, 3)
+    response = client.post(f"{LISTINGS_URL}/bulk", json=batch, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert sorted(listing["external_id"] for listing in data["listings"]) == ["olx-bulk-0", "olx-bulk-1", "olx-bulk-2"]
+    listings = client.get(f"{LISTINGS_URL}/{requirement_id}", headers=headers).json()
+    assert listings["total"] == 3
+
+def test_create_listings_bulk_repost_is_deduplicated():
+    token, requirement_id = get_test_token_and_requirement()
+    headers = {"Authorization": f"Bearer {token}"}
+    batch = bulk_listings(requirement_id, 3)
+    assert client.post(f"{LISTINGS_URL}/bulk", json=batch[:2], headers=headers).json()["total"] == 2
+    # Re-posting the whole batch stores and returns only the new listing
+    response = client.post(f"{LISTINGS_URL}/bulk", json=batch, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["listings"][0]["external_id"] == "olx-bulk-2"
+    listings = client.get(f"{LISTINGS_URL}/{requirement_id}", headers=headers).json()
+    assert listings["total"] == 3
+
+def test_create_listings_bulk_other_users_requirement():
+    token, requirement_id = get_test_token_and_requirement()
+    _, other_requirement_id = get_test_token_and_requirement()
+    headers = {"Authorization": f"Bearer {token}"}
+    batch = bulk_listings(requirement_id, 2) + bulk_listings(other_requirement_id, 1)
+    response = client.post(f"{LISTINGS_URL}/bulk", json=batch, headers=headers)
+    assert response.status_code == 403
+    # Nothing from the rejected batch is stored
+    listings = client.get(f"{LISTINGS_URL}/{requirement_id}", headers=headers).json()
+    assert listings["total"] == 0
+
+def test_create_listings_bulk_too_many():
+    from app.api.listings import MAX_BULK_LISTINGS
+    token, requirement_id = get_test_token_and_requirement()
+    headers = {"Authorization": f"Bearer {token}"}
+    batch = bulk_listings(requirement_id, MAX_BULK_LISTINGS + 1)
+    response = client.post(f"{LISTINGS_URL}/bulk", json=batch, headers=headers)
+    assert response.status_code == 422
+
+def test_image_urls_replaced_wholesale():
+    from app.models.listing import Listing
+    token, requirement_id = get_test_token_and_requirement()
+    headers = {"Authorization": f"Bearer {token}"}
+    data = {
+        "requirement_id": requirement_id,
+        "external_id": "olx-images",
+        "title": "With Images",
+        "listing_url": "https://www.olx.in/item/images",
+        "image_urls": ["https://example.com/a.jpg"]
+    }
+    listing_id = client.post(f"{LISTINGS_URL}/", json=data, headers=headers).json()["id"]
+
+    # image_urls is plain JSON: a loaded value is an ordinary list, and
+    # editing it in place is not tracked, so writes must assign a new list
+    db = TestingSessionLocal()
+    listing = db.get(Listing, listing_id)
+    assert type(listing.image_urls) is list
+    listing.image_urls.append("https://example.com/ignored.jpg")
+    db.commit()
+    db.close()
+    response = client.get(f"{LISTINGS_URL}/item/{listing_id}", headers=headers)
+    assert response.json()["image_urls"] == ["https://example.com/a.jpg"]
+
+    new_urls = ["https://example.com/a.jpg", "https://example.com/b.jpg"]
+    response = client.patch(f"{LISTINGS_URL}/item/{listing_id}", json={"image_urls": new_urls}, headers=headers)
     assert response.status_code == 200
-    assert response.json()["message"] == "Listing deleted successfully" 
\ No newline at end of file
+    response = client.get(f"{LISTINGS_URL}/item/{listing_id}", headers=headers)
+    assert response.json()["image_urls"] == new_urls
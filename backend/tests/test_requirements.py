@@ -98,4 +98,57 @@ def test_update_requirement():
     )
     assert response.status_code == 200
     data = response.json()
-    assert data["status"] == "paused" 
\ No newline at end of file
+    assert data["status"] == "paused"
+
+def create_test_requirement(headers):
+    response = client.post("/api/requirements/",
+        json={
+            "product_query": "Kindle Paperwhite",
+            "category": "electronics",
+            "budget_min": 5000,
+            "budget_max": 10000,
+            "timeline": "flexible"
+        },
+        headers=headers
+    )
+    return response.json()["id"]
+
+def test_get_requirements_not_modified():
+    headers = {"Authorization": f"Bearer {get_test_token()}"}
+    create_test_requirement(headers)
+    
+    response = client.get("/api/requirements/", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    
+    response = client.get("/api/requirements/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+def test_get_requirements_etag_changes_after_update():
+    headers = {"Authorization": f"Bearer {get_test_token()}"}
+    requirement_id = create_test_requirement(headers)
+    etag = client.get("/api/requirements/", headers=headers).headers["etag"]
+    
+    client.patch(f"/api/requirements/{requirement_id}", json={"status": "paused"}, headers=headers)
+    
+    response = client.get("/api/requirements/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["requirements"][0]["status"] == "paused"
+
+def test_get_requirements_etag_changes_on_quick_updates():
+    # Back-to-back edits land in the same second, so updated_at must be
+    # stored with sub-second precision for the ETag to tell them apart
+    headers = {"Authorization": f"Bearer {get_test_token()}"}
+    requirement_id = create_test_requirement(headers)
+    
+    etags = []
+    for new_status in ("paused", "active", "paused"):
+        client.patch(f"/api/requirements/{requirement_id}", json={"status": new_status}, headers=headers)
+        response = client.get("/api/requirements/", headers=headers)
+        assert response.status_code == 200
+        etags.append(response.headers["etag"])
+    
+    assert len(set(etags)) == len(etags)
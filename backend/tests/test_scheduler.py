@@ -0,0 +1,127 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import get_db
+from app.models.database import Base
+from app.services import scheduler
+from app.services.auth import create_user, create_access_token
+from app.models.schemas import UserCreate
+import asyncio
+import uuid
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+SCHEDULER_URL = "/api/scheduler/scheduler"
+
+def setup_module():
+    Base.metadata.create_all(bind=engine)
+
+def teardown_module():
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(autouse=True, params=["memory", "redis"])
+def task_store(request, monkeypatch):
+    """Run each test against the in-process fallback and against Redis"""
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeRedis()
+        monkeypatch.setattr(scheduler, "get_redis", lambda: server)
+    else:
+        monkeypatch.setattr(scheduler, "get_redis", lambda: None)
+    monkeypatch.setattr(scheduler, "task_store", {})
+    monkeypatch.setattr(scheduler, "user_task_ids", scheduler.defaultdict(list))
+    monkeypatch.setattr(scheduler, "_queue_stats_cache", None)
+    return request.param
+
+def get_test_headers():
+    """Helper function to get auth headers for a new user"""
+    db = TestingSessionLocal()
+    user = create_user(db, UserCreate(email=f"scheduler_{uuid.uuid4()}@example.com", password="testpassword"))
+    token = create_access_token(data={"sub": user.email})
+    db.close()
+    return {"Authorization": f"Bearer {token}"}
+
+def schedule_search(headers, requirement_id="req-1"):
+    response = client.post(f"{SCHEDULER_URL}/search", json={"requirement_id": requirement_id}, headers=headers)
+    assert response.status_code == 200
+    return response.json()["task_id"]
+
+def test_schedule_status_and_cancel():
+    headers = get_test_headers()
+    task_id = schedule_search(headers)
+
+    response = client.get(f"{SCHEDULER_URL}/status/{task_id}", headers=headers)
+    assert response.status_code == 200
+    task = response.json()["task_status"]
+    assert task["type"] == "search"
+    assert task["status"] == "queued"
+    assert task["requirement_id"] == "req-1"
+
+    response = client.delete(f"{SCHEDULER_URL}/cancel/{task_id}", headers=headers)
+    assert response.status_code == 200
+    response = client.get(f"{SCHEDULER_URL}/status/{task_id}", headers=headers)
+    assert response.json()["task_status"]["status"] == "cancelled"
+
+    # A cancelled task can't be cancelled again
+    response = client.delete(f"{SCHEDULER_URL}/cancel/{task_id}", headers=headers)
+    assert response.status_code == 404
+
+    response = client.get(f"{SCHEDULER_URL}/queue/status", headers=headers)
+    stats = response.json()["queue_status"]
+    assert stats["total_jobs"] == 1
+    assert stats["cancelled_jobs"] == 1
+    assert stats["queued_jobs"] == 0
+
+def test_cancel_twice():
+    task_id = asyncio.run(scheduler.schedule_analysis_task(["listing-1"], "user-1"))
+    assert asyncio.run(scheduler.cancel_task(task_id, "user-1")) is True
+    assert asyncio.run(scheduler.cancel_task(task_id, "user-1")) is False
+    assert asyncio.run(scheduler.cancel_task(str(uuid.uuid4()), "user-1")) is False
+
+def test_other_users_task_is_not_visible():
+    owner_headers = get_test_headers()
+    other_headers = get_test_headers()
+    task_id = schedule_search(owner_headers)
+
+    response = client.get(f"{SCHEDULER_URL}/status/{task_id}", headers=other_headers)
+    assert response.status_code == 404
+    response = client.delete(f"{SCHEDULER_URL}/cancel/{task_id}", headers=other_headers)
+    assert response.status_code == 404
+
+    response = client.get(f"{SCHEDULER_URL}/status/{task_id}", headers=owner_headers)
+    assert response.json()["task_status"]["status"] == "queued"
+
+def test_list_tasks_pagination():
+    headers = get_test_headers()
+    task_ids = [schedule_search(headers, f"req-{i}") for i in range(5)]
+    schedule_search(get_test_headers())
+
+    response = client.get(f"{SCHEDULER_URL}/tasks?limit=2&offset=0", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 5
+    assert [task["task_id"] for task in data["tasks"]] == [task_ids[4], task_ids[3]]
+
+    response = client.get(f"{SCHEDULER_URL}/tasks?limit=2&offset=4", headers=headers)
+    data = response.json()
+    assert data["total"] == 5
+    assert [task["task_id"] for task in data["tasks"]] == [task_ids[0]]
+
+    response = client.get(f"{SCHEDULER_URL}/tasks?limit=2&offset=5", headers=headers)
+    assert response.json()["tasks"] == []
@@ -0,0 +1,123 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import get_db
+from app.models.database import Base, Listing
+from app.services.auth import create_user, create_access_token
+from app.services import scraper
+from app.services.scraper import _save_scraped_listings
+from app.models.schemas import UserCreate
+import uuid
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+def setup_module():
+    Base.metadata.create_all(bind=engine)
+
+def teardown_module():
+    Base.metadata.drop_all(bind=engine)
+
+def get_test_headers():
+    """Helper function to get auth headers for a new user"""
+    db = TestingSessionLocal()
+    user = create_user(db, UserCreate(email=f"scraper_{uuid.uuid4()}@example.com", password="testpassword"))
+    token = create_access_token(data={"sub": user.email})
+    db.close()
+    return {"Authorization": f"Bearer {token}"}
+
+def create_requirement(headers):
+    response = client.post("/api/requirements/",
+        json={
+            "product_query": "Road bike",
+            "category": "sports",
+            "budget_min": 5000,
+            "budget_max": 20000,
+            "timeline": "flexible"
+        },
+        headers=headers
+    )
+    return response.json()["id"]
+
+def stored_external_ids(requirement_id):
+    db = TestingSessionLocal()
+    rows = db.query(Listing.external_id).filter(Listing.requirement_id == requirement_id).all()
+    db.close()
+    return sorted(row.external_id for row in rows)
+
+def test_save_scraped_listings_without_ids():
+    requirement_id = create_requirement(get_test_headers())
+    listings = [
+        {"id": "olx_1", "title": "With id", "url": "https://www.olx.in/item/1"},
+        {"title": "No id A", "url": "https://www.olx.in/item/a"},
+        {"title": "No id B", "url": "https://www.olx.in/item/b"},
+        {"title": "No id or url"},
+    ]
+    assert _save_scraped_listings(requirement_id, listings) == 3
+    external_ids = stored_external_ids(requirement_id)
+    assert "olx_1" in external_ids
+    assert len(external_ids) == 3
+    assert "" not in external_ids
+
+    # A rescrape of the same page stores nothing new
+    assert _save_scraped_listings(requirement_id, listings) == 0
+    assert stored_external_ids(requirement_id) == external_ids
+
+async def fast_search_listings(query, category):
+    return [
+        {"id": f"olx_fast_{i}", "title": f"{query} {i}", "price": 1000 + i, "url": f"https://www.olx.in/item/fast-{i}"}
+        for i in range(2)
+    ]
+
+async def failing_search_listings(query, category):
+    raise RuntimeError("OLX unavailable")
+
+def test_trigger_scraping(monkeypatch):
+    monkeypatch.setattr(scraper, "search_listings", fast_search_listings)
+    headers = get_test_headers()
+    requirement_id = create_requirement(headers)
+    assert client.get(f"/api/requirements/{requirement_id}", headers=headers).json()["scraping_status"] == "pending"
+
+    # TestClient runs background tasks before returning the response
+    response = client.post(f"/api/requirements/{requirement_id}/trigger-scraping", headers=headers)
+    assert response.status_code == 202
+    assert response.json()["requirement_id"] == requirement_id
+
+    requirement = client.get(f"/api/requirements/{requirement_id}", headers=headers).json()
+    assert requirement["scraping_status"] == "completed"
+    assert requirement["matching_listings_count"] == 2
+    assert requirement["last_scraped_at"] is not None
+    assert stored_external_ids(requirement_id) == ["olx_fast_0", "olx_fast_1"]
+
+def test_trigger_scraping_failure_marks_requirement(monkeypatch):
+    monkeypatch.setattr(scraper, "search_listings", failing_search_listings)
+    headers = get_test_headers()
+    requirement_id = create_requirement(headers)
+
+    response = client.post(f"/api/requirements/{requirement_id}/trigger-scraping", headers=headers)
+    assert response.status_code == 202
+    requirement = client.get(f"/api/requirements/{requirement_id}", headers=headers).json()
+    assert requirement["scraping_status"] == "failed"
+
+def test_trigger_scraping_other_users_requirement(monkeypatch):
+    monkeypatch.setattr(scraper, "search_listings", fast_search_listings)
+    requirement_id = create_requirement(get_test_headers())
+
+    response = client.post(f"/api/requirements/{requirement_id}/trigger-scraping", headers=get_test_headers())
+    assert response.status_code == 404
+    assert stored_external_ids(requirement_id) == []